@@ -13,6 +13,8 @@ class Settings(BaseSettings):
     embedding_model: str = "all-MiniLM-L6-v2"
     embedding_dim: int = 384
     api_version: str = "v1"
+    # Max relationships returned by the ownership network query
+    network_limit: int = 100
 
 
 @lru_cache
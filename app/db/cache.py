@@ -0,0 +1,53 @@
+"""
+In-process read caches for hot node lookups.
+Entries are short-lived and dropped on every write that touches the node.
+"""
+import os
+
+from app.utils.cache import TTLCache
+
+NODE_CACHE_TTL = float(os.getenv("NODE_CACHE_TTL", "60"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+LOOKUP_CACHE_TTL = float(os.getenv("LOOKUP_CACHE_TTL", "600"))
+LOOKUP_MISS_CACHE_TTL = float(os.getenv("LOOKUP_MISS_CACHE_TTL", "30"))
+AGENT_CACHE_TTL = float(os.getenv("AGENT_CACHE_TTL", "300"))
+AGENT_ERROR_CACHE_TTL = float(os.getenv("AGENT_ERROR_CACHE_TTL", "30"))
+
+# company_id -> node properties (Company or Fund)
+company_cache = TTLCache(maxsize=10_000, ttl=NODE_CACHE_TTL)
+# company_id -> Fund node properties
+investor_cache = TTLCache(maxsize=10_000, ttl=NODE_CACHE_TTL)
+# sector -> list of Fund node properties
+sector_cache = TTLCache(maxsize=1_000, ttl=NODE_CACHE_TTL)
+# endpoint + params -> encoded JSON body of graph responses (/search/all, /relationships/network)
+response_cache = TTLCache(maxsize=256, ttl=RESPONSE_CACHE_TTL)
+# (query_type, cleaned query) -> chat agent search_database result; misses are kept
+# only briefly so a burst is absorbed without pinning a stale "not found"
+lookup_cache = TTLCache(maxsize=10_000, ttl=LOOKUP_CACHE_TTL)
+lookup_miss_cache = TTLCache(maxsize=10_000, ttl=LOOKUP_MISS_CACHE_TTL)
+# company_id -> decoded Neo4j agent response for that company
+agent_response_cache = TTLCache(maxsize=1_000, ttl=AGENT_CACHE_TTL)
+# company_id -> error result of a failed agent call, so a broken agent isn't hammered
+agent_error_cache = TTLCache(maxsize=1_000, ttl=AGENT_ERROR_CACHE_TTL)
+
+
+def invalidate_node(company_id: str) -> None:
+    """
+    Drop every cached entry that may contain the given node.
+    """
+    company_cache.pop(company_id)
+    investor_cache.pop(company_id)
+    # Sector results hold node copies, so any node write can make them stale
+    sector_cache.clear()
+    invalidate_graph()
+
+
+def invalidate_graph() -> None:
+    """
+    Drop cached graph responses and lookups. Called after any node or relationship write.
+    """
+    response_cache.clear()
+    lookup_cache.clear()
+    lookup_miss_cache.clear()
+    agent_response_cache.clear()
+    agent_error_cache.clear()
@@ -1,17 +1,45 @@
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, AsyncGraphDatabase
 from dotenv import load_dotenv
 import os
-from graphdatascience.session import GdsSessions, AuraAPICredentials, DbmsConnectionInfo, SessionMemory
+import threading
 
 load_dotenv()
 
 # URI examples: "neo4j://localhost", "neo4j+s://xxx.databases.neo4j.io"
 URI = os.getenv("NEO4J_URI")
 AUTH = (os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
+NEO4J_DATABASE = os.getenv("NEO4J_DATABASE", "neo4j")
+
+# Connection pool tuning (seconds unless noted)
+NEO4J_POOL_SIZE = int(os.getenv("NEO4J_POOL", "50"))
+NEO4J_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "30"))
+NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+NEO4J_CONNECTION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_TIMEOUT", "15"))
+
+# Sync driver pool; the async driver overrides the size and acquisition timeout below
+_POOL_CONFIG = dict(
+    max_connection_pool_size=NEO4J_POOL_SIZE,
+    connection_acquisition_timeout=NEO4J_ACQUISITION_TIMEOUT,
+    max_connection_lifetime=NEO4J_MAX_CONNECTION_LIFETIME,
+    keep_alive=True,
+    connection_timeout=NEO4J_CONNECTION_TIMEOUT,
+)
+
+# The async driver serves concurrent HTTP requests: a larger pool, and a short acquisition
+# timeout so a starved pool fails fast instead of queueing requests for half a minute
+NEO4J_ASYNC_POOL_SIZE = int(os.getenv("NEO4J_ASYNC_POOL", "100"))
+NEO4J_ASYNC_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ASYNC_ACQUISITION_TIMEOUT", "5"))
+_ASYNC_POOL_CONFIG = dict(
+    _POOL_CONFIG,
+    max_connection_pool_size=NEO4J_ASYNC_POOL_SIZE,
+    connection_acquisition_timeout=NEO4J_ASYNC_ACQUISITION_TIMEOUT,
+)
 CLIENT_SECRET = os.getenv("AURA_CLIENT_SECRET")
 CLIENT_ID = os.getenv("AURA_CLIENT_ID")
 
 _driver = None
+_async_driver = None
+_tls = threading.local()
 _gds_session = None
 _gds_sessions_manager = None
 
@@ -23,6 +51,14 @@ def get_gds_session():
     global _gds_session, _gds_sessions_manager
 
     if _gds_session is None:
+        # Imported lazily: graphdatascience is heavy and only the clustering jobs need it
+        try:
+            from graphdatascience.session import GdsSessions, AuraAPICredentials, DbmsConnectionInfo, SessionMemory
+        except ImportError as e:
+            raise ImportError(
+                "graphdatascience is required for GDS sessions. Install it with: pip install graphdatascience"
+            ) from e
+
         client_id = os.getenv("AURA_CLIENT_ID")
         client_secret = os.getenv("AURA_CLIENT_SECRET")
         project_id = os.getenv("AURA_PROJECT_ID")  # Optional, can be None
@@ -72,16 +108,80 @@ def close_gds_session():
 
 
 def get_driver():
+    """
+    Returns the process-wide Neo4j driver singleton.
+
+    The driver owns the connection pool, so it must be shared rather than created per
+    request. Pool size, timeouts and keep-alive are configured from the environment.
+    """
     global _driver
     if _driver is None:
         if not URI or not AUTH[0] or not AUTH[1]:
             raise ValueError(
                 "Neo4j credentials not configured. Set NEO4J_URI, NEO4J_USERNAME, and NEO4J_PASSWORD environment variables."
             )
-        _driver = GraphDatabase.driver(URI, auth=AUTH)
+        _driver = GraphDatabase.driver(URI, auth=AUTH, **_POOL_CONFIG)
     return _driver
 
 
+def get_async_driver():
+    """
+    Returns the process-wide async Neo4j driver, used on the FastAPI request path so
+    queries do not block the event loop. Scripts and ingestion threads keep using get_driver().
+    """
+    global _async_driver
+    if _async_driver is None:
+        if not URI or not AUTH[0] or not AUTH[1]:
+            raise ValueError(
+                "Neo4j credentials not configured. "
+                "Set NEO4J_URI, NEO4J_USERNAME, and NEO4J_PASSWORD environment variables."
+            )
+        _async_driver = AsyncGraphDatabase.driver(URI, auth=AUTH, **_ASYNC_POOL_CONFIG)
+    return _async_driver
+
+
+def get_db():
+    """
+    Name of the database to target. Passing it explicitly to sessions saves the
+    driver a home-database resolution round-trip per session.
+    """
+    return NEO4J_DATABASE
+
+
+def get_thread_session():
+    """
+    Returns a session bound to the calling thread, opened on first use.
+
+    Worker threads that issue many point reads (e.g. ingestion) reuse it instead of
+    acquiring a new session per query. Use it for reads only.
+    """
+    session = getattr(_tls, "session", None)
+    if session is None or session.closed():
+        driver = get_driver()
+        # Share execute_query's bookmarks so reads always see writes made through it,
+        # even when routed to a cluster member that is lagging behind
+        session = driver.session(database=get_db(), bookmark_manager=driver.execute_query_bookmark_manager)
+        _tls.session = session
+    return session
+
+
+def release_thread_session():
+    """
+    Close the calling thread's session, if any. Call when the thread's unit of work ends.
+    """
+    session = getattr(_tls, "session", None)
+    if session is not None:
+        _tls.session = None
+        session.close()
+
+
+def thread_read(query: str, **params):
+    """
+    Run a read query in a managed transaction on the thread's session and return its records.
+    """
+    return get_thread_session().execute_read(lambda tx: list(tx.run(query, **params)))
+
+
 def close_driver():
     global _driver
     if _driver is not None:
@@ -89,6 +189,13 @@ def close_driver():
         _driver = None
 
 
+async def close_async_driver():
+    global _async_driver
+    if _async_driver is not None:
+        await _async_driver.close()
+        _async_driver = None
+
+
 def verify_connectivity():
     driver = get_driver()
     driver.verify_connectivity()
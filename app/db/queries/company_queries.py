@@ -1,49 +1,133 @@
-from app.db.neo4j_client import get_driver
+import re
+from neo4j import RoutingControl
+from neo4j.exceptions import ClientError
+from app.db.neo4j_client import get_driver, get_async_driver, get_db, thread_read
+from app.db.cache import company_cache, invalidate_node
+from app.db.schema import COMPANY_NAME_FT_INDEX, COMPANY_VECTOR_INDEX
+from app.utils.validators import is_valid_org_number
 from typing import List, Optional, Dict, Any
 
+# Characters with special meaning in Lucene query syntax
+_LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
 
-def upsert_company(company_data: Dict[str, Any]) -> None:
+# Rows per write transaction in the chunked upserts
+UPSERT_CHUNK_SIZE = 1000
+
+_Q_UPSERT_COMPANIES = """
+UNWIND $rows AS row
+MERGE (c:Company {company_id: row.company_id})
+SET c.name = row.name,
+    // Lowercased copy backing the exact-name lookup index
+    c.name_lower = toLower(row.name),
+    c.country_code = row.country_code,
+    c.description = row.description,
+    c.mission = row.mission,
+    c.sectors = row.sectors,
+    c.updated_at = datetime(),
+
+    // New fields supported by LLM ingestion
+    c.website = row.website,
+    c.num_employees = row.num_employees,
+    c.year_founded = row.year_founded,
+    c.aliases = row.aliases,
+    c.key_people = row.key_people,
+    c.portfolio = COALESCE(row.portfolio, c.portfolio, []),
+    // Only overwrite cluster_id/vector when a new value is supplied
+    c.cluster_id = COALESCE(row.cluster_id, c.cluster_id),
+    c.vector = COALESCE(row.vector, c.vector)
+"""
+
+# Label-qualified branches so each side is a company_id index seek
+_Q_GET_COMPANY = """
+MATCH (n:Company {company_id: $company_id})
+RETURN n
+UNION
+MATCH (n:Fund {company_id: $company_id})
+RETURN n
+"""
+
+# The vector index is created by app.db.schema.ensure_indexes at startup.
+_Q_SEARCH_SIMILAR = f"""
+CALL db.index.vector.queryNodes('{COMPANY_VECTOR_INDEX}', $limit, $vector)
+YIELD node, score
+RETURN node, score
+"""
+
+_Q_COMPANIES_BY_CLUSTER = """
+MATCH (c:Company {cluster_id: $cluster_id})
+RETURN c
+"""
+
+_Q_FIND_BY_FULLTEXT = f"""
+CALL db.index.fulltext.queryNodes('{COMPANY_NAME_FT_INDEX}', $lucene)
+YIELD node, score
+RETURN node
+ORDER BY score DESC
+LIMIT 1
+"""
+
+# All match modes in one query, ranked by match quality:
+# 0 exact name, 1 name without AB suffix, 2 exact alias, 3 fuzzy name, 4 fuzzy alias
+_Q_FIND_BY_NAME = """
+MATCH (n)
+WHERE ('Company' IN labels(n) OR 'Fund' IN labels(n))
+WITH n, toUpper(trim(n.name)) AS nm,
+     [alias IN coalesce(n.aliases, []) WHERE alias IS NOT NULL | toUpper(trim(toString(alias)))] AS als
+WITH n,
+  CASE
+    WHEN nm = $normalized_name THEN 0
+    WHEN nm = $normalized_name_clean THEN 1
+    WHEN $normalized_name IN als THEN 2
+    WHEN nm CONTAINS $normalized_name OR $normalized_name CONTAINS nm
+      OR nm CONTAINS $normalized_name_clean OR $normalized_name_clean CONTAINS nm THEN 3
+    WHEN ANY(a IN als WHERE a CONTAINS $normalized_name OR $normalized_name CONTAINS a
+      OR a CONTAINS $normalized_name_clean OR $normalized_name_clean CONTAINS a) THEN 4
+    ELSE NULL
+  END AS rank
+WHERE rank IS NOT NULL
+RETURN n
+ORDER BY rank
+LIMIT 1
+"""
+
+
+def _lucene_name_query(name: str) -> str:
     """
-    Upsert a Company node with full metadata.
-    
+    Build a Lucene query favouring exact name, then exact alias, then a fuzzy name match.
+    """
+    escaped = _LUCENE_SPECIAL.sub(r"\\\1", name.strip())
+    fuzzy = " AND ".join(f"{term}~1" for term in escaped.split())
+    return f'name:"{escaped}"^3 OR aliases:"{escaped}"^2 OR name:({fuzzy})'
+
+
+def _find_company_by_fulltext(company_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a company through the full-text index. Returns None when there is no hit
+    or the index has not been created yet.
+    """
+    try:
+        records = thread_read(_Q_FIND_BY_FULLTEXT, lucene=_lucene_name_query(company_name))
+    except ClientError:
+        return None
+    if records:
+        return dict(records[0]["node"])
+    return None
+
+
+def _company_params(company_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate a company row and build the Cypher parameters for it.
+
     Validates that company_id is a valid Swedish organization number before upserting.
     """
     company_id = company_data.get("company_id", "")
-    
+
     # Validate organization number format (10 digits)
-    import re
-    cleaned = re.sub(r'[-\s]', '', str(company_id))
-    if not (len(cleaned) == 10 and cleaned.isdigit()):
+    if not is_valid_org_number(company_id):
         raise ValueError(f"Invalid organization number format: '{company_id}'. Must be 10 digits (format: XXXXXX-XXXX)")
-    
-    query = """
-    MERGE (c:Company {company_id: $company_id})
-    SET c.name = $name,
-        c.country_code = $country_code,
-        c.description = $description,
-        c.mission = $mission,
-        c.sectors = $sectors,
-        c.updated_at = datetime(),
-        
-        // New fields supported by LLM ingestion
-        c.website = $website,
-        c.num_employees = $num_employees,
-        c.year_founded = $year_founded,
-        c.aliases = $aliases,
-        c.key_people = $key_people
-
-    WITH c
-    WHERE $cluster_id IS NOT NULL
-    SET c.cluster_id = $cluster_id
-    WITH c
-    WHERE $vector IS NOT NULL
-    SET c.vector = $vector
-    WITH c
-    SET c.portfolio = COALESCE($portfolio, [])
-    """
 
     # Prepare params with defaults for safety
-    params = {
+    return {
         "company_id": company_data["company_id"],
         "name": company_data["name"],
         "country_code": company_data.get("country_code", "SE"),
@@ -60,27 +144,71 @@ def upsert_company(company_data: Dict[str, Any]) -> None:
         "portfolio": company_data.get("portfolio"),
     }
 
+
+def upsert_companies_bulk(rows: List[Dict[str, Any]]) -> None:
+    """
+    Upsert many Company nodes with a single UNWIND query in one write transaction.
+
+    All rows are validated before anything is written, so one bad org number
+    aborts the whole batch instead of leaving it half-applied.
+    """
+    if not rows:
+        return
+
+    prepared = [_company_params(row) for row in rows]
+
     driver = get_driver()
-    with driver.session() as session:
-        session.run(query, params)
+    driver.execute_query(
+        _Q_UPSERT_COMPANIES, rows=prepared, database_=get_db(), routing_=RoutingControl.WRITE
+    )
+    for params in prepared:
+        invalidate_node(params["company_id"])
+
+
+def upsert_companies_chunked(rows: List[Dict[str, Any]], chunk_size: int = UPSERT_CHUNK_SIZE) -> None:
+    """
+    Upsert a large number of Company nodes as a series of UNWIND batches.
+
+    Each chunk commits in its own write transaction on a shared session, so very large
+    ingests never build one huge transaction on the server heap.
+    """
+    if not rows:
+        return
+
+    prepared = [_company_params(row) for row in rows]
+
+    driver = get_driver()
+    with driver.session(database=get_db()) as session:
+        for start in range(0, len(prepared), chunk_size):
+            chunk = prepared[start : start + chunk_size]
+            session.execute_write(lambda tx: tx.run(_Q_UPSERT_COMPANIES, rows=chunk).consume())
+            for params in chunk:
+                invalidate_node(params["company_id"])
+
+
+def upsert_company(company_data: Dict[str, Any]) -> None:
+    """
+    Upsert a Company node with full metadata.
+    
+    Validates that company_id is a valid Swedish organization number before upserting.
+    """
+    upsert_companies_bulk([company_data])
 
 
 def get_company(company_id: str) -> Optional[Dict[str, Any]]:
     """
     Retrieve a Company or Fund node by company_id.
     """
-    query = """
-    MATCH (n)
-    WHERE n.company_id = $company_id AND ('Company' IN labels(n) OR 'Fund' IN labels(n))
-    RETURN n
-    """
-    driver = get_driver()
-    with driver.session() as session:
-        result = session.run(query, company_id=company_id)
-        record = result.single()
-        if record:
-            return dict(record["n"])
-        return None
+    cached = company_cache.get(company_id)
+    if cached is not None:
+        return dict(cached)
+
+    records = thread_read(_Q_GET_COMPANY, company_id=company_id)
+    if records:
+        node = dict(records[0]["n"])
+        company_cache.set(company_id, node)
+        return dict(node)
+    return None
 
 
 def find_company_by_name(company_name: str) -> Optional[Dict[str, Any]]:
@@ -88,150 +216,125 @@ def find_company_by_name(company_name: str) -> Optional[Dict[str, Any]]:
     Find a Company or Fund node by name (case-insensitive, handles variations).
     Checks both name and aliases fields for matches.
     Returns the first matching company found.
+
+    Tries the full-text index first and only falls back to the ranked scan on a miss.
     """
+    if company_name.strip():
+        found = _find_company_by_fulltext(company_name)
+        if found:
+            return found
+
     # Normalize company name for matching
     normalized_name = company_name.strip().upper()
     # Remove common suffixes for better matching
     normalized_name_clean = normalized_name.replace(" AB", "").replace(" AB PUBL", "").replace(" AB (PUBL)", "").strip()
     
-    driver = get_driver()
-    
-    # Try exact match on name first
-    query = """
-    MATCH (n)
-    WHERE ('Company' IN labels(n) OR 'Fund' IN labels(n))
-      AND toUpper(trim(n.name)) = $normalized_name
-    RETURN n
-    LIMIT 1
-    """
-    with driver.session() as session:
-        result = session.run(query, normalized_name=normalized_name)
-        record = result.single()
-        if record:
-            return dict(record["n"])
-    
-    # Try exact match on cleaned name (without AB suffix)
-    if normalized_name_clean != normalized_name:
-        query = """
-        MATCH (n)
-        WHERE ('Company' IN labels(n) OR 'Fund' IN labels(n))
-          AND toUpper(trim(n.name)) = $normalized_name_clean
-        RETURN n
-        LIMIT 1
-        """
-        with driver.session() as session:
-            result = session.run(query, normalized_name_clean=normalized_name_clean)
-            record = result.single()
-            if record:
-                return dict(record["n"])
-    
-    # Try exact match on aliases
-    query = """
-    MATCH (n)
-    WHERE ('Company' IN labels(n) OR 'Fund' IN labels(n))
-      AND n.aliases IS NOT NULL
-      AND $normalized_name IN [alias IN n.aliases WHERE alias IS NOT NULL | toUpper(trim(toString(alias)))]
-    RETURN n
-    LIMIT 1
-    """
-    with driver.session() as session:
-        result = session.run(query, normalized_name=normalized_name)
-        record = result.single()
-        if record:
-            return dict(record["n"])
-    
-    # Try fuzzy match on name - check if name contains the search term or vice versa
-    query = """
-    MATCH (n)
-    WHERE ('Company' IN labels(n) OR 'Fund' IN labels(n))
-      AND (
-        toUpper(trim(n.name)) CONTAINS $normalized_name
-        OR $normalized_name CONTAINS toUpper(trim(n.name))
-        OR toUpper(trim(n.name)) CONTAINS $normalized_name_clean
-        OR $normalized_name_clean CONTAINS toUpper(trim(n.name))
-      )
-    RETURN n
-    LIMIT 1
-    """
-    with driver.session() as session:
-        result = session.run(query, normalized_name=normalized_name, normalized_name_clean=normalized_name_clean)
-        record = result.single()
-        if record:
-            return dict(record["n"])
-    
-    # Try fuzzy match on aliases - check if any alias contains the search term or vice versa
-    query = """
-    MATCH (n)
-    WHERE ('Company' IN labels(n) OR 'Fund' IN labels(n))
-      AND n.aliases IS NOT NULL
-      AND ANY(alias IN n.aliases WHERE alias IS NOT NULL AND (
-        toUpper(trim(toString(alias))) CONTAINS $normalized_name
-        OR $normalized_name CONTAINS toUpper(trim(toString(alias)))
-        OR toUpper(trim(toString(alias))) CONTAINS $normalized_name_clean
-        OR $normalized_name_clean CONTAINS toUpper(trim(toString(alias)))
-      ))
-    RETURN n
-    LIMIT 1
-    """
-    with driver.session() as session:
-        result = session.run(query, normalized_name=normalized_name, normalized_name_clean=normalized_name_clean)
-        record = result.single()
-        if record:
-            return dict(record["n"])
-    
+    records = thread_read(
+        _Q_FIND_BY_NAME,
+        normalized_name=normalized_name,
+        normalized_name_clean=normalized_name_clean,
+    )
+    if records:
+        return dict(records[0]["n"])
     return None
 
 
-def convert_company_to_fund(company_id: str) -> None:
+def search_similar_companies(
+    vector: List[float], limit: int = 5
+) -> List[Dict[str, Any]]:
+    """
+    Find similar companies using vector search.
+    Assumes a vector index exists on :Company(vector).
     """
-    Convert a Company node to Fund by removing Company label and adding Fund label.
+    driver = get_driver()
+    records, _, _ = driver.execute_query(
+        _Q_SEARCH_SIMILAR, vector=vector, limit=limit, database_=get_db(), routing_=RoutingControl.READ
+    )
+    return [
+        {"company": dict(record["node"]), "score": record["score"]}
+        for record in records
+    ]
+
+
+def get_companies_by_cluster(cluster_id: int) -> List[Dict[str, Any]]:
     """
-    query = """
-    MATCH (n {company_id: $company_id})
-    WHERE 'Company' IN labels(n)
-    REMOVE n:Company
-    SET n:Fund
+    Get all companies in a specific cluster.
     """
     driver = get_driver()
-    with driver.session() as session:
-        session.run(query, company_id=company_id)
+    records, _, _ = driver.execute_query(
+        _Q_COMPANIES_BY_CLUSTER, cluster_id=cluster_id, database_=get_db(), routing_=RoutingControl.READ
+    )
+    return [dict(record["c"]) for record in records]
 
 
-def search_similar_companies(
-    vector: List[float], limit: int = 5
-) -> List[Dict[str, Any]]:
+# Async variants for the FastAPI request path
+
+
+async def upsert_companies_bulk_async(rows: List[Dict[str, Any]]) -> None:
     """
-    Find similar companies using vector search.
-    Assumes a vector index exists on :Company(vector).
+    Async version of upsert_companies_bulk.
     """
-    # Note: This query assumes a vector index named 'company_vector_index' exists.
-    # If using exact KNN or just cosine similarity on all nodes (slow), the query would be different.
-    # For production with 100k nodes, a vector index is required.
+    if not rows:
+        return
 
-    query = """
-    CALL db.index.vector.queryNodes('company_vector_index', $limit, $vector)
-    YIELD node, score
-    RETURN node, score
+    prepared = [_company_params(row) for row in rows]
+
+    driver = get_async_driver()
+    await driver.execute_query(
+        _Q_UPSERT_COMPANIES, rows=prepared, database_=get_db(), routing_=RoutingControl.WRITE
+    )
+    for params in prepared:
+        invalidate_node(params["company_id"])
+
+
+async def upsert_company_async(company_data: Dict[str, Any]) -> None:
     """
+    Async version of upsert_company.
+    """
+    await upsert_companies_bulk_async([company_data])
 
-    driver = get_driver()
-    with driver.session() as session:
-        result = session.run(query, vector=vector, limit=limit)
-        return [
-            {"company": dict(record["node"]), "score": record["score"]}
-            for record in result
-        ]
+
+async def get_company_async(company_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Async version of get_company.
+    """
+    cached = company_cache.get(company_id)
+    if cached is not None:
+        return dict(cached)
+
+    driver = get_async_driver()
+    records, _, _ = await driver.execute_query(
+        _Q_GET_COMPANY, company_id=company_id, database_=get_db(), routing_=RoutingControl.READ
+    )
+    if records:
+        node = dict(records[0]["n"])
+        company_cache.set(company_id, node)
+        return dict(node)
+    return None
 
 
-def get_companies_by_cluster(cluster_id: int) -> List[Dict[str, Any]]:
+async def search_similar_companies_async(
+    vector: List[float], limit: int = 5
+) -> List[Dict[str, Any]]:
     """
-    Get all companies in a specific cluster.
+    Async version of search_similar_companies.
+    """
+    driver = get_async_driver()
+    records, _, _ = await driver.execute_query(
+        _Q_SEARCH_SIMILAR, vector=vector, limit=limit, database_=get_db(), routing_=RoutingControl.READ
+    )
+    return [
+        {"company": dict(record["node"]), "score": record["score"]}
+        for record in records
+    ]
+
+
+async def get_companies_by_cluster_async(cluster_id: int) -> List[Dict[str, Any]]:
     """
-    query = """
-    MATCH (c:Company {cluster_id: $cluster_id})
-    RETURN c
+    Async version of get_companies_by_cluster.
     """
-    driver = get_driver()
-    with driver.session() as session:
-        result = session.run(query, cluster_id=cluster_id)
-        return [dict(record["c"]) for record in result]
+    driver = get_async_driver()
+    records, _, _ = await driver.execute_query(
+        _Q_COMPANIES_BY_CLUSTER, cluster_id=cluster_id, database_=get_db(), routing_=RoutingControl.READ
+    )
+    return [dict(record["c"]) for record in records]
@@ -1,53 +1,77 @@
-from app.db.neo4j_client import get_driver
-from typing import List, Optional, Dict, Any
+from neo4j import READ_ACCESS, RoutingControl
+from app.db.neo4j_client import get_driver, get_async_driver, get_db, thread_read
+from app.db.cache import investor_cache, sector_cache, invalidate_node
+from typing import Iterator, List, Optional, Dict, Any
 
+# Rows per write transaction in the chunked upserts
+UPSERT_CHUNK_SIZE = 1000
 
-def upsert_investor(investor_data: Dict[str, Any]) -> None:
-    """
-    Upsert a Fund (Investor) node.
+_Q_UPSERT_INVESTORS = """
+UNWIND $rows AS row
+MERGE (f:Fund {company_id: row.company_id})
+REMOVE f:Company
+SET f.name = row.name,
+    f.name_lower = toLower(row.name),
+    f.country_code = row.country_code,
+    f.description = COALESCE(row.description, f.description, ""),
+    f.sectors = COALESCE(row.sectors, f.sectors, []),
+    f.mission = COALESCE(row.mission, f.mission, ""),
+    f.website = COALESCE(row.website, f.website, ""),
+    f.num_employees = COALESCE(row.num_employees, f.num_employees),
+    f.year_founded = COALESCE(row.year_founded, f.year_founded, ""),
+    f.aliases = COALESCE(row.aliases, f.aliases, []),
+    f.key_people = COALESCE(row.key_people, f.key_people, []),
+    f.updated_at = datetime(),
+    f.investment_thesis = COALESCE(row.investment_thesis, f.investment_thesis, ""),
+    f.portfolio = COALESCE(row.portfolio, f.portfolio, []),
+    f.vector = COALESCE(row.vector, f.vector)
+// Keep (:Fund)-[:INVESTS_IN]->(:Sector) edges in sync with f.sectors
+WITH f
+OPTIONAL MATCH (f)-[old:INVESTS_IN]->(s:Sector)
+WHERE NOT s.name IN f.sectors
+DELETE old
+WITH DISTINCT f
+FOREACH (name IN [x IN f.sectors WHERE x IS NOT NULL] |
+    MERGE (s:Sector {name: name})
+    MERGE (f)-[:INVESTS_IN]->(s))
+"""
 
-    Expected keys in investor_data:
-    - company_id (str) - Org No or unique ID
-    - name (str)
-    - country_code (str)
-    - description (str)
-    - sectors (List[str])
-    - vector (List[float], optional)
-    - investment_thesis (str, optional)
-    
-    Validates that company_id is a valid Swedish organization number before upserting.
-    """
-    company_id = investor_data.get("company_id", "")
-    
-    # Validate organization number format (10 digits)
-    import re
-    cleaned = re.sub(r'[-\s]', '', str(company_id))
-    #if not (len(cleaned) == 10 and cleaned.isdigit()):
-     #   raise ValueError(f"Invalid organization number format: '{company_id}'. Must be 10 digits (format: XXXXXX-XXXX)")
-    
-    query = """
-    MERGE (f:Fund {company_id: $company_id})
-    REMOVE f:Company
-    SET f.name = $name,
-        f.country_code = $country_code,
-        f.description = COALESCE($description, f.description, ""),
-        f.sectors = COALESCE($sectors, f.sectors, []),
-        f.mission = COALESCE($mission, f.mission, ""),
-        f.website = COALESCE($website, f.website, ""),
-        f.num_employees = COALESCE($num_employees, f.num_employees),
-        f.year_founded = COALESCE($year_founded, f.year_founded, ""),
-        f.aliases = COALESCE($aliases, f.aliases, []),
-        f.key_people = COALESCE($key_people, f.key_people, []),
-        f.updated_at = datetime(),
-        f.investment_thesis = COALESCE($investment_thesis, f.investment_thesis, "")
-    WITH f
-    WHERE $vector IS NOT NULL
-    SET f.vector = $vector
-    WITH f
-    SET f.portfolio = COALESCE($portfolio, f.portfolio, [])
-    """
-
-    params = {
+_Q_GET_INVESTOR = """
+MATCH (f:Fund {company_id: $company_id})
+RETURN f
+"""
+
+# Label-qualified match so the lookup is a company_id index seek
+_Q_CONVERT_TO_FUND = """
+MATCH (c:Company {company_id: $company_id})
+REMOVE c:Company
+SET c:Fund
+FOREACH (name IN [x IN coalesce(c.sectors, []) WHERE x IS NOT NULL] |
+    MERGE (s:Sector {name: name})
+    MERGE (c)-[:INVESTS_IN]->(s))
+"""
+
+_Q_INVESTORS_BY_SECTOR = """
+MATCH (:Sector {name: $sector})<-[:INVESTS_IN]-(f:Fund)
+RETURN f
+"""
+
+_Q_ALL_INVESTORS = """
+MATCH (f:Fund)
+RETURN f
+"""
+
+_Q_ALL_COMPANIES = """
+MATCH (c:Company)
+RETURN c
+"""
+
+
+def _investor_params(investor_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the Cypher parameters for a Fund (Investor) row.
+    """
+    return {
         "company_id": investor_data["company_id"],
         "name": investor_data["name"],
         "country_code": investor_data.get("country_code", "SE"),
@@ -64,81 +88,186 @@ def upsert_investor(investor_data: Dict[str, Any]) -> None:
         "investment_thesis": investor_data.get("investment_thesis"),
     }
 
+
+def upsert_investors_bulk(rows: List[Dict[str, Any]]) -> None:
+    """
+    Upsert many Fund (Investor) nodes with a single UNWIND query in one write transaction.
+    """
+    if not rows:
+        return
+
+    prepared = [_investor_params(row) for row in rows]
+
+    driver = get_driver()
+    driver.execute_query(
+        _Q_UPSERT_INVESTORS, rows=prepared, database_=get_db(), routing_=RoutingControl.WRITE
+    )
+    for params in prepared:
+        invalidate_node(params["company_id"])
+
+
+def upsert_investors_chunked(rows: List[Dict[str, Any]], chunk_size: int = UPSERT_CHUNK_SIZE) -> None:
+    """
+    Upsert a large number of Fund (Investor) nodes as a series of UNWIND batches.
+
+    Each chunk commits in its own write transaction on a shared session, so very large
+    ingests never build one huge transaction on the server heap.
+    """
+    if not rows:
+        return
+
+    prepared = [_investor_params(row) for row in rows]
+
     driver = get_driver()
-    with driver.session() as session:
-        session.run(query, params)
+    with driver.session(database=get_db()) as session:
+        for start in range(0, len(prepared), chunk_size):
+            chunk = prepared[start : start + chunk_size]
+            session.execute_write(lambda tx: tx.run(_Q_UPSERT_INVESTORS, rows=chunk).consume())
+            for params in chunk:
+                invalidate_node(params["company_id"])
+
+
+def upsert_investor(investor_data: Dict[str, Any]) -> None:
+    """
+    Upsert a Fund (Investor) node.
+
+    Expected keys in investor_data:
+    - company_id (str) - Org No or unique ID
+    - name (str)
+    - country_code (str)
+    - description (str)
+    - sectors (List[str])
+    - vector (List[float], optional)
+    - investment_thesis (str, optional)
+    """
+    upsert_investors_bulk([investor_data])
 
 
 def get_investor(company_id: str) -> Optional[Dict[str, Any]]:
     """
     Retrieve a Fund node by company_id.
     """
-    query = """
-    MATCH (f:Fund {company_id: $company_id})
-    RETURN f
-    """
-    driver = get_driver()
-    with driver.session() as session:
-        result = session.run(query, company_id=company_id)
-        record = result.single()
-        if record:
-            return dict(record["f"])
-        return None
+    cached = investor_cache.get(company_id)
+    if cached is not None:
+        return dict(cached)
+
+    records = thread_read(_Q_GET_INVESTOR, company_id=company_id)
+    if records:
+        node = dict(records[0]["f"])
+        investor_cache.set(company_id, node)
+        return dict(node)
+    return None
 
 
 def convert_company_to_fund(company_id: str) -> None:
     """
     Converts a Company node to Fund by removing Company label and adding Fund label.
     """
-    query = """
-    MATCH (c)
-    WHERE c.company_id = $company_id AND 'Company' IN labels(c)
-    REMOVE c:Company
-    SET c:Fund
-    """
     driver = get_driver()
-    with driver.session() as session:
-        session.run(query, company_id=company_id)
+    driver.execute_query(
+        _Q_CONVERT_TO_FUND, company_id=company_id, database_=get_db(), routing_=RoutingControl.WRITE
+    )
+    invalidate_node(company_id)
 
 
 def find_investors_by_sector(sector: str) -> List[Dict[str, Any]]:
     """
     Find investors interested in a specific sector.
+    Walks the (:Sector)<-[:INVESTS_IN]-(:Fund) edges instead of scanning every Fund's sectors list.
     """
-    query = """
-    MATCH (f:Fund)
-    WHERE $sector IN f.sectors
-    RETURN f
+    cached = sector_cache.get(sector)
+    if cached is not None:
+        return [dict(node) for node in cached]
+
+    driver = get_driver()
+    records, _, _ = driver.execute_query(
+        _Q_INVESTORS_BY_SECTOR, sector=sector, database_=get_db(), routing_=RoutingControl.READ
+    )
+    investors = [dict(record["f"]) for record in records]
+    sector_cache.set(sector, investors)
+    return [dict(node) for node in investors]
+
+
+def _iter_nodes(query: str, key: str, fetch_size: int) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield node dicts from a read query. Records are pulled from the server in
+    batches of fetch_size, so memory is bounded by the batch rather than the result.
     """
     driver = get_driver()
-    with driver.session() as session:
-        result = session.run(query, sector=sector)
-        return [dict(record["f"]) for record in result]
+    with driver.session(database=get_db(), default_access_mode=READ_ACCESS, fetch_size=fetch_size) as session:
+        for record in session.run(query):
+            yield dict(record[key])
+
+
+def iter_all_investors(fetch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """
+    Stream all Fund nodes.
+    """
+    return _iter_nodes(_Q_ALL_INVESTORS, "f", fetch_size)
+
+
+def iter_all_companies(fetch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """
+    Stream all Company nodes.
+    """
+    return _iter_nodes(_Q_ALL_COMPANIES, "c", fetch_size)
 
 
 def get_all_investors() -> List[Dict[str, Any]]:
     """
     Retrieve all Fund nodes.
     """
-    query = """
-    MATCH (f:Fund)
-    RETURN f
-    """
-    driver = get_driver()
-    with driver.session() as session:
-        result = session.run(query)
-        return [dict(record["f"]) for record in result]
+    return list(iter_all_investors())
 
 
 def get_all_companies() -> List[Dict[str, Any]]:
     """
     Retrieve all Company nodes.
     """
-    query = """
-    MATCH (c:Company)
-    RETURN c
+    return list(iter_all_companies())
+
+
+# Async variants for the FastAPI request path
+
+
+async def upsert_investors_bulk_async(rows: List[Dict[str, Any]]) -> None:
+    """
+    Async version of upsert_investors_bulk.
     """
-    driver = get_driver()
-    with driver.session() as session:
-        result = session.run(query)
-        return [dict(record["c"]) for record in result]
+    if not rows:
+        return
+
+    prepared = [_investor_params(row) for row in rows]
+
+    driver = get_async_driver()
+    await driver.execute_query(
+        _Q_UPSERT_INVESTORS, rows=prepared, database_=get_db(), routing_=RoutingControl.WRITE
+    )
+    for params in prepared:
+        invalidate_node(params["company_id"])
+
+
+async def upsert_investor_async(investor_data: Dict[str, Any]) -> None:
+    """
+    Async version of upsert_investor.
+    """
+    await upsert_investors_bulk_async([investor_data])
+
+
+async def get_investor_async(company_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Async version of get_investor.
+    """
+    cached = investor_cache.get(company_id)
+    if cached is not None:
+        return dict(cached)
+
+    driver = get_async_driver()
+    records, _, _ = await driver.execute_query(
+        _Q_GET_INVESTOR, company_id=company_id, database_=get_db(), routing_=RoutingControl.READ
+    )
+    if records:
+        node = dict(records[0]["f"])
+        investor_cache.set(company_id, node)
+        return dict(node)
+    return None
@@ -1,5 +1,60 @@
-from app.db.neo4j_client import get_driver
-from typing import List, Dict, Any
+from neo4j import AsyncManagedTransaction, AsyncSession, RoutingControl
+from app.config import get_settings
+from app.db.neo4j_client import get_driver, get_db
+from app.db.cache import invalidate_graph
+from typing import List, Optional, Dict, Any
+
+_Q_ADD_OWNERSHIP = """
+MATCH (owner:Company|Fund {company_id: $owner_id})
+MATCH (target:Company|Fund {company_id: $company_id})
+MERGE (owner)-[r:OWNS]->(target)
+SET r += $properties, r.updated_at = datetime()
+"""
+
+_Q_COMPANY_OWNERS = """
+MATCH (owner)-[r:OWNS]->(target:Company {company_id: $company_id})
+RETURN properties(owner) AS owner, properties(r) AS rel, labels(owner) AS labels
+"""
+
+_Q_PORTFOLIO = """
+MATCH (owner:Company|Fund {company_id: $owner_id})-[r:OWNS]->(target:Company|Fund)
+RETURN properties(target) AS target, properties(r) AS rel
+"""
+
+# The investor and its holdings in one round-trip; collect() drops the null row an
+# investor without holdings produces
+_Q_INVESTOR_WITH_PORTFOLIO = """
+MATCH (inv:Fund {company_id: $investor_id})
+OPTIONAL MATCH (inv)-[r:OWNS]->(t:Company|Fund)
+RETURN inv.name AS name,
+       collect(CASE WHEN t IS NULL THEN null
+               ELSE {company_id: t.company_id, name: t.name, rel: properties(r)} END) AS holdings
+"""
+
+_Q_ALL_RELATIONSHIPS = """
+MATCH (s:Company|Fund)-[r:OWNS]->(t:Company|Fund)
+RETURN s.company_id AS source, t.company_id AS target,
+       coalesce(r.share_percentage, 0) AS ownership
+"""
+
+# One streamed result for the whole graph. Every branch returns the same positional
+# columns, so rows carry only projected primitives and no node maps are built server-side.
+# Node defaults are applied in the DB.
+_Q_ALL_GRAPH = """
+MATCH (c:Company)
+RETURN 'company' AS kind, c.company_id AS id, coalesce(c.name, 'Unknown Company') AS name,
+       coalesce(c.sectors[0], 'Unknown') AS sector, coalesce(c.country_code, 'SE') AS country,
+       c.website AS website, null AS target, null AS ownership
+UNION ALL
+MATCH (f:Fund)
+RETURN 'fund' AS kind, f.company_id AS id, coalesce(f.name, 'Unknown Investor') AS name,
+       coalesce(f.sectors[0], 'Unknown') AS sector, coalesce(f.country_code, 'SE') AS country,
+       f.website AS website, null AS target, null AS ownership
+UNION ALL
+MATCH (s:Company|Fund)-[r:OWNS]->(t:Company|Fund)
+RETURN 'link' AS kind, s.company_id AS id, null AS name, null AS sector, null AS country,
+       null AS website, t.company_id AS target, coalesce(r.share_percentage, 0) AS ownership
+"""
 
 
 def add_ownership(owner_id: str, company_id: str, properties: Dict[str, Any] = None) -> None:
@@ -19,21 +74,19 @@ def add_ownership(owner_id: str, company_id: str, properties: Dict[str, Any] = N
     # Both source and target can be Fund or Company
     # This allows bidirectional ownership between funds
 
-    query = """
-    MATCH (owner)
-    WHERE owner.company_id = $owner_id AND ('Fund' IN labels(owner) OR 'Company' IN labels(owner))
-    MATCH (target)
-    WHERE target.company_id = $company_id AND ('Fund' IN labels(target) OR 'Company' IN labels(target))
-    MERGE (owner)-[r:OWNS]->(target)
-    SET r += $properties, r.updated_at = datetime()
-    """
-
     if properties is None:
         properties = {}
 
     driver = get_driver()
-    with driver.session() as session:
-        session.run(query, owner_id=owner_id, company_id=company_id, properties=properties)
+    driver.execute_query(
+        _Q_ADD_OWNERSHIP,
+        owner_id=owner_id,
+        company_id=company_id,
+        properties=properties,
+        database_=get_db(),
+        routing_=RoutingControl.WRITE,
+    )
+    invalidate_graph()
 
 
 def get_company_owners(company_id: str) -> List[Dict[str, Any]]:
@@ -41,130 +94,129 @@ def get_company_owners(company_id: str) -> List[Dict[str, Any]]:
     Get all owners (Funds or Companies) of a specific company.
     Returns a list of dictionaries containing owner details and relationship properties.
     """
-    query = """
-    MATCH (owner)-[r:OWNS]->(target:Company {company_id: $company_id})
-    RETURN owner, r, labels(owner) as labels
-    """
-
     driver = get_driver()
-    with driver.session() as session:
-        result = session.run(query, company_id=company_id)
-        owners = []
-        for record in result:
-            owner_data = dict(record["owner"])
-            owner_data["_labels"] = record["labels"]
-            owner_data["_relationship"] = dict(record["r"])
-            owners.append(owner_data)
-        return owners
+    records, _, _ = driver.execute_query(
+        _Q_COMPANY_OWNERS, company_id=company_id, database_=get_db(), routing_=RoutingControl.READ
+    )
+    # Plain maps from Cypher, so no Node/Relationship objects are hydrated and copied
+    owners = []
+    for owner, rel, labels in records:
+        owners.append({**owner, "_labels": labels, "_relationship": rel})
+    return owners
 
 
 def get_portfolio(owner_id: str) -> List[Dict[str, Any]]:
     """
     Get all entities (Funds or Companies) owned by a specific entity (Fund or Company).
     """
-    query = """
-    MATCH (owner {company_id: $owner_id})-[r:OWNS]->(target)
-    WHERE 'Fund' IN labels(target) OR 'Company' IN labels(target)
-    RETURN target, r
-    """
+    driver = get_driver()
+    records, _, _ = driver.execute_query(
+        _Q_PORTFOLIO, owner_id=owner_id, database_=get_db(), routing_=RoutingControl.READ
+    )
+    return _shape_portfolio(records)
+
+
+def _shape_portfolio(records) -> List[Dict[str, Any]]:
+    portfolio = []
+    for target, rel in records:
+        portfolio.append({**target, "_relationship": rel})
+    return portfolio
+
 
+def get_investor_with_portfolio(investor_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch a Fund's name together with everything it owns.
+    Returns {"name": ..., "holdings": [{"company_id", "name", "rel"}, ...]}, or None if no such Fund exists.
+    """
     driver = get_driver()
-    with driver.session() as session:
-        result = session.run(query, owner_id=owner_id)
-        portfolio = []
-        for record in result:
-            target_data = dict(record["target"])
-            target_data["_relationship"] = dict(record["r"])
-            portfolio.append(target_data)
-        return portfolio
+    records, _, _ = driver.execute_query(
+        _Q_INVESTOR_WITH_PORTFOLIO, investor_id=investor_id, database_=get_db(), routing_=RoutingControl.READ
+    )
+    return _shape_investor_with_portfolio(records)
+
+
+def _shape_investor_with_portfolio(records) -> Optional[Dict[str, Any]]:
+    if not records:
+        return None
+    name, holdings = records[0]
+    return {"name": name, "holdings": holdings}
+
 
+MAX_NETWORK_DEPTH = 5
 
-def get_network_graph(entity_id: str, depth: int = 2) -> Dict[str, Any]:
+
+def _build_network_query(depth: int) -> str:
+    """
+    Build the network query for one depth. Neo4j doesn't allow parameters in
+    variable-length patterns, so the depth has to be part of the query text.
+    """
+    # Depth 1 is a plain single-hop expand rather than a variable-length one
+    pattern = "-[r:OWNS]-" if depth == 1 else f"-[r:OWNS*1..{depth}]-"
+    # Undirected relationship pattern captures both (A)-[:OWNS]->(B) and (B)-[:OWNS]->(A)
+    # OPTIONAL MATCH keeps the root row even when it has no connections, and the label
+    # on `connected` is checked during expansion rather than filtered afterwards.
+    # Edges and nodes are deduplicated with DISTINCT in the database and come back as
+    # ready-made lists on a single row. The LIMIT sits on the streamed edge rows, before
+    # any sort or aggregation, so expansion around hub nodes stops once enough edges are
+    # found; edges come out in expansion order, so every kept edge is connected to the root.
+    # Only the kept edges are then ordered by id so repeated calls match.
+    return f"""
+    MATCH (root:Company|Fund {{company_id: $entity_id}})
+    OPTIONAL MATCH path = (root){pattern}(connected:Company|Fund)
+    UNWIND coalesce(relationships(path), [null]) AS rel
+    WITH DISTINCT root, rel
+    LIMIT $limit
+    WITH root, rel ORDER BY elementId(rel)
+    WITH root, collect(rel) AS rels
+    CALL {{
+        WITH root, rels
+        UNWIND rels AS rel
+        UNWIND [startNode(rel), endNode(rel)] AS n
+        WITH DISTINCT root, n
+        WHERE n <> root
+        WITH n ORDER BY n.company_id
+        RETURN collect({{id: n.company_id, name: coalesce(n.name, 'Unknown'),
+                         node_type: CASE WHEN n:Company THEN 'company' ELSE 'fund' END}}) AS nodes
+    }}
+    RETURN {{id: root.company_id, name: coalesce(root.name, 'Unknown'),
+             node_type: CASE WHEN root:Company THEN 'company' ELSE 'fund' END}} AS root,
+           nodes,
+           [rel IN rels | {{source: startNode(rel).company_id, target: endNode(rel).company_id,
+                            rel_type: type(rel),
+                            ownership_pct: coalesce(rel.share_percentage, rel.ownership_pct)}}] AS edges
+    """
+
+
+# Built once so each depth always sends byte-identical text and reuses its cached plan
+_NETWORK_QUERIES = {depth: _build_network_query(depth) for depth in range(1, MAX_NETWORK_DEPTH + 1)}
+
+
+def get_network_graph(entity_id: str, depth: int = 2, limit: Optional[int] = None) -> Dict[str, Any]:
     """
     Get ownership network graph around an entity up to specified depth.
     Returns nodes and relationships.
     Handles bidirectional ownership (both directions of OWNS relationships).
     The undirected relationship pattern `-[r:OWNS*1..{depth}]-` captures both directions.
     """
-    # Neo4j doesn't allow parameters in variable-length patterns, so we format the depth
     # Limit depth to prevent excessive queries
-    depth = min(max(1, depth), 5)
+    depth = min(max(1, depth), MAX_NETWORK_DEPTH)
 
-    # Undirected relationship pattern captures both (A)-[:OWNS]->(B) and (B)-[:OWNS]->(A)
-    query = f"""
-    MATCH (root)
-    WHERE root.company_id = $entity_id AND (root:Company OR root:Fund)
-    MATCH path = (root)-[r:OWNS*1..{depth}]-(connected)
-    WHERE (connected:Company OR connected:Fund)
-    WITH root, connected, relationships(path) as rels
-    RETURN DISTINCT root, connected, rels, labels(root) as root_labels, labels(connected) as connected_labels
-    LIMIT 100
-    """
+    if limit is None:
+        limit = get_settings().network_limit
 
     driver = get_driver()
-    with driver.session() as session:
-        result = session.run(query, entity_id=entity_id)
-        nodes = {}
-        edges = []
-        root_node = None
-
-        for record in result:
-            root = dict(record["root"])
-            connected = dict(record["connected"])
-            root_labels = record["root_labels"]
-            connected_labels = record["connected_labels"]
-            rels = record["rels"]
-
-            root_id = root.get("company_id", "")
-            if not root_node and root_id == entity_id:
-                root_node = {
-                    "id": root_id,
-                    "name": root.get("name", "Unknown"),
-                    "node_type": "company" if "Company" in root_labels else "fund",
-                }
-                nodes[root_id] = root_node
-
-            node_id = connected.get("company_id", "")
-            if node_id and node_id not in nodes:
-                nodes[node_id] = {
-                    "id": node_id,
-                    "name": connected.get("name", "Unknown"),
-                    "node_type": "company" if "Company" in connected_labels else "fund",
-                }
-
-            # Add edges from relationships
-            for rel in rels:
-                rel_dict = dict(rel)
-                edges.append(
-                    {
-                        "source": root_id,
-                        "target": node_id,
-                        "rel_type": rel.type,
-                        "ownership_pct": rel_dict.get("share_percentage") or rel_dict.get("ownership_pct"),
-                    }
-                )
-
-        # Ensure root node is included
-        if not root_node:
-            # Try to get root node separately
-            root_query = """
-            MATCH (root)
-            WHERE root.company_id = $entity_id AND (root:Company OR root:Fund)
-            RETURN root, labels(root) as labels
-            """
-            root_result = session.run(root_query, entity_id=entity_id)
-            root_record = root_result.single()
-            if root_record:
-                root = dict(root_record["root"])
-                root_labels = root_record["labels"]
-                root_node = {
-                    "id": root.get("company_id", entity_id),
-                    "name": root.get("name", "Unknown"),
-                    "node_type": "company" if "Company" in root_labels else "fund",
-                }
-                nodes[entity_id] = root_node
-
-        return {"root_id": entity_id, "nodes": list(nodes.values()), "edges": edges, "depth": depth}
+    records, _, _ = driver.execute_query(
+        _NETWORK_QUERIES[depth], entity_id=entity_id, limit=limit, database_=get_db(), routing_=RoutingControl.READ
+    )
+    return _shape_network(records, entity_id, depth)
+
+
+def _shape_network(records, entity_id: str, depth: int) -> Dict[str, Any]:
+    # No row means the root doesn't exist
+    if not records:
+        return {"root_id": entity_id, "nodes": [], "edges": [], "depth": depth}
+    root, nodes, edges = records[0]
+    return {"root_id": entity_id, "nodes": [root, *nodes], "edges": edges, "depth": depth}
 
 
 def get_all_relationships() -> List[Dict[str, Any]]:
@@ -172,19 +224,118 @@ def get_all_relationships() -> List[Dict[str, Any]]:
     Get all OWNS relationships between Funds and Companies.
     Returns a list of dictionaries containing source, target, and ownership percentage.
     """
-    query = """
-    MATCH (s)-[r:OWNS]->(t)
-    WHERE (s:Fund OR s:Company) AND (t:Fund OR t:Company)
-    RETURN s.company_id as source, t.company_id as target, 
-           coalesce(r.share_percentage, 0) as ownership
-    """
+    driver = get_driver()
+    # Every column is already a primitive, so the driver materializes the dicts in one call
+    return driver.execute_query(
+        _Q_ALL_RELATIONSHIPS,
+        database_=get_db(),
+        routing_=RoutingControl.READ,
+        result_transformer_=lambda result: result.data("source", "target", "ownership"),
+    )
 
+
+def get_all_graph() -> Dict[str, Any]:
+    """
+    Fetch every Company, every Fund and every OWNS relationship in a single round-trip.
+    Returns {"companies": [...], "investors": [...], "relationships": [...]} of positional tuples:
+    (id, name, sector, country, website) for nodes and (source, target, ownership) for relationships.
+    """
     driver = get_driver()
-    with driver.session() as session:
-        result = session.run(query)
-        relationships = []
-        for record in result:
-            relationships.append(
-                {"source": record["source"], "target": record["target"], "ownership": record["ownership"]}
-            )
-        return relationships
+    return driver.execute_query(
+        _Q_ALL_GRAPH, database_=get_db(), routing_=RoutingControl.READ, result_transformer_=_collect_graph
+    )
+
+
+def _new_graph() -> Dict[str, Any]:
+    return {"companies": [], "investors": [], "relationships": []}
+
+
+def _add_graph_row(graph: Dict[str, Any], row) -> None:
+    kind, node_id, name, sector, country, website, target, ownership = row
+    if kind == "link":
+        graph["relationships"].append((node_id, target, ownership))
+    else:
+        graph["companies" if kind == "company" else "investors"].append((node_id, name, sector, country, website))
+
+
+def _collect_graph(result) -> Dict[str, Any]:
+    graph = _new_graph()
+    for row in result:
+        _add_graph_row(graph, row)
+    # Release the connection as soon as the stream is drained
+    result.consume()
+    return graph
+
+
+# Async variants for the FastAPI request path. They run on the request-scoped
+# AsyncSession from app.dependencies, so one session serves the whole request.
+
+
+async def _read_all(tx: AsyncManagedTransaction, query: str, **params) -> list:
+    result = await tx.run(query, **params)
+    return [record async for record in result]
+
+
+async def add_ownership_async(
+    session: AsyncSession, owner_id: str, company_id: str, properties: Dict[str, Any] = None
+) -> None:
+    """
+    Async version of add_ownership.
+    """
+    if owner_id == company_id:
+        return
+
+    if properties is None:
+        properties = {}
+
+    async def work(tx: AsyncManagedTransaction):
+        result = await tx.run(_Q_ADD_OWNERSHIP, owner_id=owner_id, company_id=company_id, properties=properties)
+        await result.consume()
+
+    await session.execute_write(work)
+    invalidate_graph()
+
+
+async def get_portfolio_async(session: AsyncSession, owner_id: str) -> List[Dict[str, Any]]:
+    """
+    Async version of get_portfolio.
+    """
+    records = await session.execute_read(_read_all, _Q_PORTFOLIO, owner_id=owner_id)
+    return _shape_portfolio(records)
+
+
+async def get_investor_with_portfolio_async(session: AsyncSession, investor_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Async version of get_investor_with_portfolio.
+    """
+    records = await session.execute_read(_read_all, _Q_INVESTOR_WITH_PORTFOLIO, investor_id=investor_id)
+    return _shape_investor_with_portfolio(records)
+
+
+async def get_network_graph_async(
+    session: AsyncSession, entity_id: str, depth: int = 2, limit: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Async version of get_network_graph.
+    """
+    depth = min(max(1, depth), MAX_NETWORK_DEPTH)
+    if limit is None:
+        limit = get_settings().network_limit
+    records = await session.execute_read(_read_all, _NETWORK_QUERIES[depth], entity_id=entity_id, limit=limit)
+    return _shape_network(records, entity_id, depth)
+
+
+async def get_all_graph_async(session: AsyncSession) -> Dict[str, Any]:
+    """
+    Async version of get_all_graph.
+    """
+    return await session.execute_read(_collect_graph_async)
+
+
+async def _collect_graph_async(tx: AsyncManagedTransaction) -> Dict[str, Any]:
+    result = await tx.run(_Q_ALL_GRAPH)
+    graph = _new_graph()
+    async for row in result:
+        _add_graph_row(graph, row)
+    await result.consume()
+    return graph
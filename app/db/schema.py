@@ -0,0 +1,113 @@
+import logging
+
+from neo4j.exceptions import Neo4jError
+
+from app.config import get_settings
+from app.db.neo4j_client import get_driver, get_db
+
+logger = logging.getLogger(__name__)
+
+# Full-text (Lucene) index backing find_company_by_name
+COMPANY_NAME_FT_INDEX = "company_name_ft"
+# Vector index queried by search_similar_companies. Quantized so the HNSW walk reads
+# compressed vectors; an index created before quantization must be dropped to pick it up.
+COMPANY_VECTOR_INDEX = "company_vector_index"
+
+# Seconds to wait for newly created indexes to come online
+INDEX_AWAIT_TIMEOUT = 60
+
+# company_id is unique per label: (label, constraint, plain range index earlier versions
+# created on the same property). The constraint's backing index replaces the plain one,
+# which is only dropped once the constraint can go in and is kept while it can't.
+COMPANY_ID_CONSTRAINTS = [
+    ("Company", "company_id_unique", "company_id_c"),
+    ("Fund", "fund_id_unique", "company_id_f"),
+]
+
+SCHEMA_STATEMENTS = [
+    "CREATE INDEX sector_name IF NOT EXISTS FOR (s:Sector) ON (s.name)",
+    # Case-insensitive exact name lookups in the chat agent
+    "CREATE INDEX company_name_lower IF NOT EXISTS FOR (c:Company) ON (c.name_lower)",
+    "CREATE INDEX fund_name_lower IF NOT EXISTS FOR (f:Fund) ON (f.name_lower)",
+    "CREATE INDEX cluster_idx IF NOT EXISTS FOR (c:Company) ON (c.cluster_id)",
+    f"""
+    CREATE VECTOR INDEX {COMPANY_VECTOR_INDEX} IF NOT EXISTS
+    FOR (c:Company) ON (c.vector)
+    OPTIONS {{indexConfig: {{
+        `vector.dimensions`: {get_settings().embedding_dim},
+        `vector.similarity_function`: 'cosine',
+        `vector.quantization.enabled`: true
+    }}}}
+    """,
+    f"""
+    CREATE FULLTEXT INDEX {COMPANY_NAME_FT_INDEX} IF NOT EXISTS
+    FOR (n:Company|Fund) ON EACH [n.name, n.aliases]
+    """,
+]
+
+
+def _ensure_company_id_constraint(session, label: str, constraint: str, legacy_index: str) -> bool:
+    """
+    Create the company_id uniqueness constraint for one label, swapping out the legacy
+    plain index. Returns False, with company_id still indexed, if the constraint can't be created.
+    """
+    create_constraint = (
+        f"CREATE CONSTRAINT {constraint} IF NOT EXISTS FOR (n:{label}) REQUIRE n.company_id IS UNIQUE"
+    )
+    create_index = f"CREATE INDEX {legacy_index} IF NOT EXISTS FOR (n:{label}) ON (n.company_id)"
+
+    try:
+        # Succeeds when the constraint already exists or nothing stands in its way
+        session.run(create_constraint).consume()
+    except Neo4jError:
+        # Duplicate ids block the constraint; keep (or create) the plain index instead
+        duplicates = session.run(
+            f"MATCH (n:{label}) WHERE n.company_id IS NOT NULL "
+            "WITH n.company_id AS id, count(*) AS copies WHERE copies > 1 RETURN count(id) AS ids"
+        ).single()["ids"]
+        if duplicates:
+            session.run(create_index).consume()
+            logger.warning(
+                "%s duplicate %s.company_id values block constraint %s; "
+                "keeping index %s (see scripts/fix_dual_labeled_funds.cypher)",
+                duplicates,
+                label,
+                constraint,
+                legacy_index,
+            )
+            return False
+        # Otherwise the legacy index on the same property is in the way. Swap it out,
+        # putting it back if the constraint still fails.
+        session.run(f"DROP INDEX {legacy_index} IF EXISTS").consume()
+        try:
+            session.run(create_constraint).consume()
+        except Neo4jError as e:
+            session.run(create_index).consume()
+            logger.warning("Could not create constraint %s, keeping index %s: %s", constraint, legacy_index, e)
+            return False
+        return True
+
+    session.run(f"DROP INDEX {legacy_index} IF EXISTS").consume()
+    return True
+
+
+def ensure_indexes() -> None:
+    """
+    Create the indexes the query helpers rely on. Idempotent, safe to run on every startup.
+    """
+    driver = get_driver()
+    failed = 0
+    total = len(COMPANY_ID_CONSTRAINTS) + len(SCHEMA_STATEMENTS)
+    with driver.session(database=get_db()) as session:
+        for label, constraint, legacy_index in COMPANY_ID_CONSTRAINTS:
+            if not _ensure_company_id_constraint(session, label, constraint, legacy_index):
+                failed += 1
+        for statement in SCHEMA_STATEMENTS:
+            # One bad statement (e.g. duplicate ids blocking a constraint) shouldn't skip the rest
+            try:
+                session.run(statement).consume()
+            except Neo4jError as e:
+                failed += 1
+                logger.warning("Schema statement failed: %s: %s", statement, e)
+        session.run("CALL db.awaitIndexes($timeout)", timeout=INDEX_AWAIT_TIMEOUT).consume()
+    logger.info("Ensured %d/%d schema statements", total - failed, total)
@@ -1,7 +1,9 @@
-from typing import Annotated
+from typing import Annotated, AsyncIterator
 from fastapi import Depends, Header, HTTPException
+from neo4j import AsyncSession
 
 from app.config import Settings, get_settings
+from app.db.neo4j_client import get_async_driver, get_db
 
 
 SettingsDep = Annotated[Settings, Depends(get_settings)]
@@ -17,3 +19,12 @@ async def verify_api_key(x_api_key: str = Header(None)) -> str:
 
 
 ApiKeyDep = Annotated[str, Depends(verify_api_key)]
+
+
+async def get_neo4j_session() -> AsyncIterator[AsyncSession]:
+    """One AsyncSession per HTTP request, shared by every query the handler runs."""
+    async with get_async_driver().session(database=get_db()) as session:
+        yield session
+
+
+Neo4jSessionDep = Annotated[AsyncSession, Depends(get_neo4j_session)]
@@ -1,7 +1,10 @@
+import asyncio
 import logging
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+import orjson
 
 from app.config import get_settings
 from app.routers import companies, investors, relationships, search, chat
@@ -14,14 +17,40 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     logger.info("Starting Northern Lights API...")
     try:
-        settings = get_settings()
+        # Module-level settings, loaded once when the app object is built
         logger.info(f"API version: {settings.api_version}")
+        try:
+            from app.db.neo4j_client import get_async_driver
+
+            # Build the async driver up front so the first request doesn't pay for it
+            get_async_driver()
+        except Exception as e:
+            logger.warning(f"Could not create async Neo4j driver: {e}")
+        try:
+            from app.db.schema import ensure_indexes
+
+            # Schema statements and awaitIndexes are blocking calls; keep them off the event loop
+            await asyncio.to_thread(ensure_indexes)
+        except Exception as e:
+            logger.warning(f"Could not ensure Neo4j indexes: {e}")
         yield
     except Exception as e:
         logger.error(f"Error during startup: {e}", exc_info=True)
         raise
     finally:
         logger.info("Shutting down Northern Lights API...")
+        try:
+            from app.db.neo4j_client import close_async_driver
+
+            await close_async_driver()
+        except Exception as e:
+            logger.warning(f"Error closing async Neo4j driver: {e}")
+        try:
+            from app.services.agent_service import close_http_client
+
+            await close_http_client()
+        except Exception as e:
+            logger.warning(f"Error closing agent HTTP client: {e}")
         # Clean up GDS session if it was created
         try:
             from app.db.neo4j_client import close_gds_session
@@ -31,6 +60,16 @@ async def lifespan(app: FastAPI):
             logger.warning(f"Error closing GDS session: {e}")
 
 
+class OrjsonResponse(JSONResponse):
+    """
+    JSON response rendered with orjson, which encodes the large /search/all and network
+    payloads much faster than stdlib json. Stands in for FastAPI's deprecated ORJSONResponse.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
 try:
     settings = get_settings()
 except Exception as e:
@@ -42,27 +81,23 @@ app = FastAPI(
     description="Nordic Fund & Company Transparency Platform",
     version=settings.api_version,
     lifespan=lifespan,
+    default_response_class=OrjsonResponse,
 )
 
 # CORS Middleware - Must be added before routes
-# Note: allow_credentials=True with allow_origins=["*"] doesn't work.
-# We need to list specific origins or use allow_credentials=False
+# Note: allow_credentials=True with a wildcard origin doesn't work, so origins are matched
+# with one regex (compiled once by Starlette) instead of a list. A "*.vercel.app" entry in
+# allow_origins is compared literally and never matched preview deployments.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
+    allow_origin_regex=(
         # Development
-        "http://localhost:5173",
-        "http://localhost:3000",
-        "http://localhost:8080",
-        "http://127.0.0.1:5173",
-        "http://127.0.0.1:3000",
-        "http://127.0.0.1:8080",
-        # Production - Vercel domains
-        "https://northern-lights-2uld.vercel.app",
-        "https://*.vercel.app",  # Wildcard for preview deployments
+        r"^https?://(localhost|127\.0\.0\.1)(:\d+)?$"
+        # Production - Vercel domains, including preview deployments
+        r"|^https://([a-z0-9-]+\.)*vercel\.app$"
         # Production - GCP backend (self-reference for internal calls)
-        "https://northern-lights-412412805222.europe-north2.run.app",
-    ],
+        r"|^https://northern-lights-412412805222\.europe-north2\.run\.app$"
+    ),
     allow_credentials=False,  # Set to False since we're allowing multiple origins
     allow_methods=["*"],
     allow_headers=["*"],
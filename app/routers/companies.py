@@ -1,6 +1,5 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from uuid import uuid4
-from concurrent.futures import ThreadPoolExecutor
 import asyncio
 
 from app.models import (
@@ -13,7 +12,7 @@ from app.models import (
 from app.dependencies import SettingsDep, ApiKeyDep
 from app.db.queries import company_queries
 from app.services.graph_service import GraphService
-from app.services.portfolio_ingestion import ingest_company_with_portfolio
+from app.services.portfolio_ingestion import INGEST_EXECUTOR, ingest_company_with_portfolio
 
 router = APIRouter()
 
@@ -56,14 +55,13 @@ async def ingest_company(
     """
     try:
         # Run sync Playwright code in thread pool to avoid blocking async event loop
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            result = await loop.run_in_executor(
-                executor,
-                ingest_company_with_portfolio,
-                body.organization_id,
-                body.name
-            )
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            INGEST_EXECUTOR,
+            ingest_company_with_portfolio,
+            body.organization_id,
+            body.name
+        )
         
         return {
             "job_id": str(uuid4()),
@@ -97,7 +95,7 @@ async def ingest_company(
 @router.get("/{organization_id}", response_model=CompanyOut)
 async def get_company(organization_id: str, api_key: ApiKeyDep):
     """Get company by Swedish Org. No."""
-    db_data = company_queries.get_company(organization_id)
+    db_data = await company_queries.get_company_async(organization_id)
     if not db_data:
         raise HTTPException(404, f"Company {organization_id} not found")
     
@@ -112,7 +110,7 @@ async def search_companies(body: CompanySearch, api_key: ApiKeyDep):
     query_vector = graph_service.model.encode(body.query).tolist()
     
     # Search similar companies
-    results = company_queries.search_similar_companies(query_vector, limit=body.limit)
+    results = await company_queries.search_similar_companies_async(query_vector, limit=body.limit)
     
     # Convert to response model
     search_results = []
@@ -137,7 +135,7 @@ async def search_companies(body: CompanySearch, api_key: ApiKeyDep):
 async def get_leads(organization_id: str, api_key: ApiKeyDep):
     """Get companies in same Leiden cluster (competitive leads)."""
     # Get company to find its cluster_id
-    db_data = company_queries.get_company(organization_id)
+    db_data = await company_queries.get_company_async(organization_id)
     if not db_data:
         raise HTTPException(404, f"Company {organization_id} not found")
     
@@ -150,7 +148,7 @@ async def get_leads(organization_id: str, api_key: ApiKeyDep):
         )
     
     # Get all companies in same cluster
-    cluster_companies = company_queries.get_companies_by_cluster(cluster_id)
+    cluster_companies = await company_queries.get_companies_by_cluster_async(cluster_id)
     
     # Convert to CompanyOut and exclude the original company
     leads = []
@@ -1,49 +1,49 @@
 from fastapi import APIRouter, HTTPException
 
 from app.models import InvestorOut, InvestorCreate, InvestorPortfolio, HoldingOut, InvestorType
-from app.dependencies import ApiKeyDep
+from app.dependencies import ApiKeyDep, Neo4jSessionDep
 from app.db.queries import investor_queries, relationship_queries
 
 router = APIRouter()
 
 
+# Fields copied straight from the DB row; investor_id and cluster_id are set explicitly
+_INVESTOR_OUT_FIELDS = frozenset(InvestorOut.model_fields) - {"investor_id", "cluster_id"}
+# Bound once; holdings are built per row from trusted DB data, so validation is skipped
+# here and left to the endpoint's response_model
+_HOLDING_CTOR = HoldingOut.model_construct
+
+
 def _db_to_investor_out(db_data: dict, investor_id: str = None) -> InvestorOut:
     """Convert DB dict to InvestorOut model"""
     if not db_data:
         return None
-    
-    data = db_data.copy()
-    # Map company_id to organization_id
-    if "company_id" in data:
-        data["organization_id"] = data.pop("company_id")
-    
+
+    # One pass: map company_id to organization_id and drop keys the model doesn't have
+    data = {
+        ("organization_id" if k == "company_id" else k): v
+        for k, v in db_data.items()
+        if k in _INVESTOR_OUT_FIELDS or k == "company_id"
+    }
+
     # Use provided investor_id or generate from organization_id
     if not investor_id:
         investor_id = data.get("organization_id", "UNKNOWN")
-    
-    # Extract cluster_id
-    cluster_id = data.pop("cluster_id", None)
-    
-    # Ensure list fields
-    if "sectors" not in data or data["sectors"] is None:
-        data["sectors"] = []
-    
-    try:
-        investor = InvestorOut(
-            investor_id=investor_id,
-            cluster_id=cluster_id,
-            **{k: v for k, v in data.items() if k in InvestorOut.model_fields}
-        )
-        return investor
-    except Exception as e:
-        raise ValueError(f"Failed to convert DB data to InvestorOut: {e}")
+
+    # Rows come from our own DB, so skip validation here; the response_model still
+    # validates the payload on the way out
+    return InvestorOut.model_construct(
+        investor_id=investor_id,
+        cluster_id=db_data.get("cluster_id"),
+        **data,
+    )
 
 
 @router.get("/{investor_id}", response_model=InvestorOut)
 async def get_investor(investor_id: str, api_key: ApiKeyDep):
     """Get investor by ID (uses organization_id/company_id in DB)"""
     # In DB, investors are stored with company_id = organization_id
-    db_data = investor_queries.get_investor(investor_id)
+    db_data = await investor_queries.get_investor_async(investor_id)
     if not db_data:
         raise HTTPException(404, f"Investor {investor_id} not found")
     
@@ -51,32 +51,28 @@ async def get_investor(investor_id: str, api_key: ApiKeyDep):
 
 
 @router.get("/{investor_id}/portfolio", response_model=InvestorPortfolio)
-async def get_portfolio(investor_id: str, api_key: ApiKeyDep):
+async def get_portfolio(investor_id: str, api_key: ApiKeyDep, session: Neo4jSessionDep):
     """Get investor's portfolio holdings."""
-    # Check investor exists
-    investor_data = investor_queries.get_investor(investor_id)
-    if not investor_data:
+    # Existence check and holdings come back from one query
+    portfolio_data = await relationship_queries.get_investor_with_portfolio_async(session, investor_id)
+    if portfolio_data is None:
         raise HTTPException(404, f"Investor {investor_id} not found")
-    
-    # Get portfolio from relationships
-    portfolio_data = relationship_queries.get_portfolio(investor_id)
-    
-    # Convert to HoldingOut
+
     holdings = []
-    for item in portfolio_data:
-        company_data = item if "_relationship" not in item else {k: v for k, v in item.items() if k != "_relationship"}
-        rel_data = item.get("_relationship", {})
-        
-        holdings.append(HoldingOut(
-            company_id=company_data.get("company_id", ""),
-            company_name=company_data.get("name", "Unknown"),
+    append = holdings.append
+    for item in portfolio_data["holdings"]:
+        rel_data = item["rel"] or {}
+
+        append(_HOLDING_CTOR(
+            company_id=item["company_id"] or "",
+            company_name=item["name"] or "Unknown",
             ownership_pct=rel_data.get("share_percentage") or rel_data.get("ownership_pct"),
             invested_at=rel_data.get("created_at") or rel_data.get("invested_at"),
         ))
-    
+
     return InvestorPortfolio(
         investor_id=investor_id,
-        name=investor_data.get("name", "Unknown"),
+        name=portfolio_data["name"] or "Unknown",
         holdings=holdings,
     )
 
@@ -94,8 +90,8 @@ async def create_investor(body: InvestorCreate, api_key: ApiKeyDep):
         "investor_type": body.investor_type.value,
         "country_code": "SE",
     }
-    investor_queries.upsert_investor(investor_data)
+    await investor_queries.upsert_investor_async(investor_data)
     
     # Fetch back to return
-    db_data = investor_queries.get_investor(body.organization_id)
+    db_data = await investor_queries.get_investor_async(body.organization_id)
     return _db_to_investor_out(db_data, investor_id=investor_id)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 
 from app.models import (
     RelationshipCreate,
@@ -8,14 +8,15 @@ from app.models import (
     NetworkEdge,
     RelationType,
 )
-from app.dependencies import ApiKeyDep
+from app.dependencies import ApiKeyDep, Neo4jSessionDep
+from app.db.cache import response_cache
 from app.db.queries import relationship_queries
 
 router = APIRouter()
 
 
 @router.post("/", response_model=RelationshipOut, status_code=201)
-async def create_relationship(body: RelationshipCreate, api_key: ApiKeyDep):
+async def create_relationship(body: RelationshipCreate, api_key: ApiKeyDep, session: Neo4jSessionDep):
     """Create ownership/investment relationship."""
     # Prevent self-ownership
     if body.source_id == body.target_id:
@@ -30,7 +31,8 @@ async def create_relationship(body: RelationshipCreate, api_key: ApiKeyDep):
     if body.amount is not None:
         properties["amount"] = body.amount
     
-    relationship_queries.add_ownership(
+    await relationship_queries.add_ownership_async(
+        session,
         owner_id=body.source_id,
         company_id=body.target_id,
         properties=properties
@@ -43,9 +45,14 @@ async def create_relationship(body: RelationshipCreate, api_key: ApiKeyDep):
 
 
 @router.get("/network/{entity_id}", response_model=NetworkGraph)
-async def get_network(entity_id: str, depth: int = 2, api_key: ApiKeyDep = None):
+async def get_network(entity_id: str, session: Neo4jSessionDep, depth: int = 2, api_key: ApiKeyDep = None):
     """Get ownership network graph around an entity."""
-    graph_data = relationship_queries.get_network_graph(entity_id, depth=depth)
+    cache_key = ("network", entity_id, depth)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    graph_data = await relationship_queries.get_network_graph_async(session, entity_id, depth=depth)
     
     # Convert to response model
     nodes = [
@@ -67,9 +74,12 @@ async def get_network(entity_id: str, depth: int = 2, api_key: ApiKeyDep = None)
         for edge in graph_data["edges"]
     ]
     
-    return NetworkGraph(
+    graph = NetworkGraph(
         root_id=graph_data["root_id"],
         nodes=nodes,
         edges=edges,
         depth=graph_data["depth"],
     )
+    content = graph.model_dump_json().encode()
+    response_cache.set(cache_key, content)
+    return Response(content=content, media_type="application/json")
@@ -1,10 +1,17 @@
-from fastapi import APIRouter
+import heapq
+import logging
+
+import orjson
+from fastapi import APIRouter, Response
 from pydantic import BaseModel
 
-from app.dependencies import ApiKeyDep
+from app.dependencies import ApiKeyDep, Neo4jSessionDep
+
+from app.db.cache import response_cache
+from app.db.queries import relationship_queries
 
-from app.db.queries import investor_queries, relationship_queries
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -60,78 +67,55 @@ async def unified_search(body: UnifiedSearchQuery, api_key: ApiKeyDep):
             )
         )
 
-    return sorted(results, key=lambda x: x.score, reverse=True)[: body.limit]
+    # Top-k selection, same order as sorted(..., reverse=True)[:limit]
+    return heapq.nlargest(body.limit, results, key=lambda x: x.score)
 
 
 # Get all companies and investors for the frontend graph functionality
 @router.get("/all")
-async def get_all_entities(api_key: ApiKeyDep):
+async def get_all_entities(api_key: ApiKeyDep, session: Neo4jSessionDep):
     """Get all companies and investors for the frontend graph functionality."""
-    import logging
-    logger = logging.getLogger(__name__)
-    
+    # The graph only changes on ingestion, so serve the already-encoded body while it's fresh
+    cached = response_cache.get(("search_all",))
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
     try:
-        # 1. Fetch nodes
-        companies = investor_queries.get_all_companies()
-        investors = investor_queries.get_all_investors()
+        # Nodes and edges come back from one streamed query as positional rows
+        graph = await relationship_queries.get_all_graph_async(session)
 
+        # 1. Shape nodes
         nodes = []
+        append = nodes.append
 
-        # Process companies
-        for c in companies:
-            try:
-                nodes.append(
-                    {
-                        "id": c["company_id"],
-                        "name": c.get("name", "Unknown Company"),
-                        "type": "company",
-                        "orgNumber": c.get("company_id", ""),
-                        "sector": c.get("sectors", ["Unknown"])[0] if c.get("sectors") else "Unknown",
-                        "country": c.get("country_code", "SE"),
-                        "cluster": 1,
-                        "val": 10,
-                        "website": c.get("website"),
-                    }
-                )
-            except Exception as e:
-                logger.error(f"Error processing company {c}: {e}")
-                continue
-
-        # Process investors
-        for inv in investors:
-            try:
-                nodes.append(
+        for node_type, val, rows in (("company", 10, graph["companies"]), ("fund", 15, graph["investors"])):
+            for node_id, name, sector, country, website in rows:
+                append(
                     {
-                        "id": inv["company_id"],
-                        "name": inv.get("name", "Unknown Investor"),
-                        "type": "fund",
-                        "orgNumber": inv.get("company_id", ""),
-                        "sector": inv.get("sectors", ["Unknown"])[0] if inv.get("sectors") else "Unknown",
-                        "country": inv.get("country_code", "SE"),
+                        "id": node_id,
+                        "name": name,
+                        "type": node_type,
+                        "orgNumber": node_id or "",
+                        "sector": sector,
+                        "country": country,
                         "cluster": 1,
-                        "val": 15,
-                        "website": inv.get("website"),
+                        "val": val,
+                        "website": website,
                     }
                 )
-            except Exception as e:
-                logger.error(f"Error processing investor {inv}: {e}")
-                continue
-
-        # 2. Fetch edges
-        rels = relationship_queries.get_all_relationships()
-
-        links = []
-        for r in rels:
-            try:
-                links.append({"source": r["source"], "target": r["target"], "ownership": r["ownership"]})
-            except Exception as e:
-                logger.error(f"Error processing relationship {r}: {e}")
-                continue
-
-        logger.info(f"Returning {len(nodes)} nodes and {len(links)} links")
-        return {"nodes": nodes, "links": links}
+
+        # 2. Shape edges
+        links = [
+            {"source": source, "target": target, "ownership": ownership}
+            for source, target, ownership in graph["relationships"]
+        ]
+
+        logger.info("Returning %d nodes and %d links", len(nodes), len(links))
+        content = orjson.dumps({"nodes": nodes, "links": links})
+        response_cache.set(("search_all",), content)
+        return Response(content=content, media_type="application/json")
     
     except Exception as e:
-        logger.error(f"Error in get_all_entities: {e}", exc_info=True)
+        logger.error("Error in get_all_entities: %s", e, exc_info=True)
         # Re-raise the exception to return proper HTTP error response
         raise
@@ -9,17 +9,28 @@ Main flow:
 """
 
 import asyncio
-
+import base64
+import functools
 import logging
 import os
-import json
 import re
-from concurrent.futures import ThreadPoolExecutor
+import time
 
 import httpx
-
-from app.db.queries import company_queries
-from app.services.portfolio_ingestion import ingest_company_with_portfolio
+import orjson
+from neo4j.time import Date, DateTime, Time
+
+from app.db.cache import agent_error_cache, agent_response_cache, lookup_cache, lookup_miss_cache
+from app.db.neo4j_client import get_async_driver, get_db
+from app.utils.cache import TTLCache
+from app.utils.validators import normalize_org_number
+from app.services.portfolio_ingestion import (
+    INGEST_EXECUTOR,
+    gemini_model as ingestion_gemini_model,
+    ingest_company_with_portfolio,
+    lookup_org_number_from_web,
+    tavily_client,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +38,45 @@ NEO_AGENT_URL = os.getenv("NEO_AGENT_INVOKE")
 AURA_CLIENT_ID = os.getenv("AURA_CLIENT_ID")
 AURA_CLIENT_SECRET = os.getenv("AURA_CLIENT_SECRET")
 
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to HTTP/1.1 keep-alive without it
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_http_client = None
+
+# Aura OAuth token shared across requests until shortly before it expires
+TOKEN_REFRESH_MARGIN = 60
+_token_cache = {"token": None, "expires_at": 0.0}
+_token_lock = asyncio.Lock()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide HTTP client for the Aura token endpoint and the Neo4j agent,
+    so calls reuse warm pooled connections instead of paying a TCP+TLS handshake each time.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            # Agent calls are sporadic; keep idle connections well past httpx's 5s default
+            # so the next query skips the TCP+TLS handshake
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=32, keepalive_expiry=60.0),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 def extract_final_text(log):
     """
@@ -41,36 +91,84 @@ def extract_final_text(log):
     if not isinstance(log, list):
         return None
 
-    def get_text(entry):
+    # Search from the end backwards, one type lookup per entry
+    for i in range(len(log) - 1, -1, -1):
+        entry = log[i]
         if not isinstance(entry, dict):
-            return None
+            continue
+
+        entry_type = entry.get("type")
+        if entry_type == "text":
+            # PRIORITY 1: Direct text response (the final answer)
+            text = entry.get("text")
+        elif not entry_type:
+            # PRIORITY 2: Common alt key
+            text = entry.get("message")
+            if not text:
+                # PRIORITY 3: Sometimes tool outputs embed text
+                # Only used when there's no type field (avoid matching tool results)
+                output = entry.get("output")
+                text = output.get("text") if isinstance(output, dict) else None
+                if not isinstance(text, str):
+                    text = None
+        else:
+            continue
 
-        # PRIORITY 1: Direct text response (the final answer)
-        # This is the final user-facing message from the agent
-        if entry.get("type") == "text" and entry.get("text"):
-            return entry["text"]
+        if text:
+            return text.strip()
 
-        # PRIORITY 2: Common alt key
-        if entry.get("message") and not entry.get("type"):
-            return entry["message"]
+    return None
 
-        # PRIORITY 3: Sometimes tool outputs embed text
-        # Only use this if no type field (avoid matching tool results)
-        if not entry.get("type"):
-            output = entry.get("output")
-            if isinstance(output, dict) and isinstance(output.get("text"), str):
-                return output["text"]
 
-        return None
+# Fixed classifier instructions, sent as the system instruction so the per-request
+# prompt is just the query and the shared prefix can be cached by the provider
+CLASSIFIER_SYSTEM_PROMPT = """You are a query classifier for a Swedish company and fund database system.
 
-    # Search from the end backwards
-    for entry in reversed(log):
-        text = get_text(entry)
-        if text:
-            return text.strip()
+Analyze the user query and classify it into one of these types:
 
-    return None
+1. "org_id" - The query is clearly a Swedish organization number (10 digits, format XXXXXX-XXXX) or UUID
+2. "company_name" - The query is a simple company name lookup (1-5 words, just asking to find a company)
+3. "general_query" - The query is a complex question that requires graph traversal, relationship analysis, or multi-step reasoning (e.g., "Who owns X?", "What else does Y own?", "Show me all funds in tech sector")
 
+Examples:
+- "556043-4200" → org_id
+- "Investor AB" → company_name
+- "ericsson" → company_name (simple lookup)
+- "Who owns ericsson?" → general_query (complex question)
+- "Who owns ericsson and what else do they also own?" → general_query (multi-part question)
+- "Show me all companies owned by Investor AB" → general_query (graph query)
+- "What funds invest in tech startups?" → general_query (complex filter/analysis)
+
+IMPORTANT:
+- Handle misspellings intelligently (e.g., "ericsson" vs "eriksson" - both are company_name)
+- Don't rely on question marks - understand intent
+- Simple lookups (just a company name) should be company_name
+- Complex questions requiring graph analysis should be general_query
+
+Return JSON only with this structure:
+{
+    "type": "org_id" | "company_name" | "general_query",
+    "confidence": 0.0-1.0,
+    "reasoning": "brief explanation"
+}
+"""
+
+# Structured output: Gemini returns validated JSON matching this, never fenced or free text
+CLASSIFIER_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "type": {"type": "STRING", "enum": ["org_id", "company_name", "general_query"]},
+        "confidence": {"type": "NUMBER"},
+        "reasoning": {"type": "STRING"},
+    },
+    "required": ["type", "confidence"],
+}
+
+CLASSIFIER_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": CLASSIFIER_RESPONSE_SCHEMA,
+    "temperature": 0,
+}
 
 # Try to import Gemini for agentic query classification
 try:
@@ -80,9 +178,17 @@ try:
     if GEMINI_API_KEY:
         genai.configure(api_key=GEMINI_API_KEY)
         try:
-            gemini_model = genai.GenerativeModel("gemini-2.0-flash-exp")
+            gemini_model = genai.GenerativeModel(
+                "gemini-2.0-flash-exp",
+                system_instruction=CLASSIFIER_SYSTEM_PROMPT,
+                generation_config=CLASSIFIER_GENERATION_CONFIG,
+            )
         except:
-            gemini_model = genai.GenerativeModel("gemini-1.5-pro")
+            gemini_model = genai.GenerativeModel(
+                "gemini-1.5-pro",
+                system_instruction=CLASSIFIER_SYSTEM_PROMPT,
+                generation_config=CLASSIFIER_GENERATION_CONFIG,
+            )
     else:
         gemini_model = None
         logger.warning("GEMINI_API_KEY not set - query classification will fall back to pattern matching")
@@ -91,6 +197,15 @@ except ImportError:
     logger.warning("Gemini not available - query classification will fall back to pattern matching")
 
 
+# Gemini classifications keyed by normalized query, so repeats skip the LLM round-trip
+CLASSIFIER_CACHE_ENABLED = os.getenv("ENABLE_CLASSIFIER_CACHE", "true").lower() in ("1", "true", "yes")
+CLASSIFIER_CACHE_TTL = float(os.getenv("CLASSIFIER_CACHE_TTL", "86400"))
+_classifier_cache = TTLCache(maxsize=4096, ttl=CLASSIFIER_CACHE_TTL)
+classifier_cache_stats = {"hits": 0, "misses": 0}
+# normalized query -> future of the Gemini classification currently in flight
+_classify_inflight: dict[str, asyncio.Future] = {}
+
+
 class InputValidator:
     """Agentically validates user input and determines query type using Gemini"""
 
@@ -99,60 +214,86 @@ class InputValidator:
     SWEDISH_ORG_PATTERN = re.compile(r"^\d{6}-?\d{4}$")
 
     @classmethod
-    def _classify_query_agentic(cls, query: str) -> dict[str, any]:
+    async def _classify_query_agentic(cls, query: str) -> dict[str, any]:
         """
         Use Gemini to agentically classify the query type.
         Handles misspellings and understands intent.
         """
-        if not gemini_model:
-            # Fallback to pattern matching if Gemini not available
-            return cls._classify_query_fallback(query)
-
-        try:
-            prompt = f"""You are a query classifier for a Swedish company and fund database system.
-
-Analyze this user query and classify it into one of these types:
+        classification = cls._classify_without_gemini(query)
+        if classification is not None:
+            return classification
+        return await cls._classify_with_gemini(query)
 
-1. "org_id" - The query is clearly a Swedish organization number (10 digits, format XXXXXX-XXXX) or UUID
-2. "company_name" - The query is a simple company name lookup (1-5 words, just asking to find a company)
-3. "general_query" - The query is a complex question that requires graph traversal, relationship analysis, or multi-step reasoning (e.g., "Who owns X?", "What else does Y own?", "Show me all funds in tech sector")
+    @classmethod
+    async def classify_query(cls, query: str) -> dict[str, any]:
+        """
+        Like _classify_query_agentic, but concurrent requests for the same query share a
+        single Gemini call.
+        """
+        classification = cls._classify_without_gemini(query)
+        if classification is not None:
+            return classification
 
-Examples:
-- "556043-4200" → org_id
-- "Investor AB" → company_name
-- "ericsson" → company_name (simple lookup)
-- "Who owns ericsson?" → general_query (complex question)
-- "Who owns ericsson and what else do they also own?" → general_query (multi-part question)
-- "Show me all companies owned by Investor AB" → general_query (graph query)
-- "What funds invest in tech startups?" → general_query (complex filter/analysis)
+        cache_key = query.strip().lower()
+        pending = _classify_inflight.get(cache_key)
+        if pending is not None:
+            try:
+                return dict(await asyncio.shield(pending))
+            except asyncio.CancelledError:
+                # The request that owned the call went away; classify on our own
+                if not pending.cancelled():
+                    raise
+
+        pending = asyncio.get_running_loop().create_future()
+        _classify_inflight[cache_key] = pending
+        try:
+            classification = await cls._classify_with_gemini(query)
+            pending.set_result(classification)
+            return dict(classification)
+        except BaseException:
+            pending.cancel()
+            raise
+        finally:
+            # After an owner is cancelled, waiters each register their own call; only drop ours
+            if _classify_inflight.get(cache_key) is pending:
+                del _classify_inflight[cache_key]
 
-IMPORTANT:
-- Handle misspellings intelligently (e.g., "ericsson" vs "eriksson" - both are company_name)
-- Don't rely on question marks - understand intent
-- Simple lookups (just a company name) should be company_name
-- Complex questions requiring graph analysis should be general_query
+    @classmethod
+    def _classify_without_gemini(cls, query: str) -> dict[str, any] | None:
+        """Classify cheaply when possible. Returns None if Gemini has to decide."""
+        # Org numbers and UUIDs are matched deterministically; no need to ask Gemini
+        pattern_match = cls._classify_query_fallback(query)
+        if pattern_match["type"] == "org_id" and pattern_match["confidence"] == 1.0:
+            return pattern_match
 
-Query: "{query}"
+        if not gemini_model:
+            # Fallback to pattern matching if Gemini not available
+            return pattern_match
 
-Return JSON only with this structure:
-{{
-    "type": "org_id" | "company_name" | "general_query",
-    "confidence": 0.0-1.0,
-    "reasoning": "brief explanation"
-}}
-"""
+        # Long or multi-clause questions are always graph queries
+        if len(query) > 200 or ("?" in query and len(query.split()) > 6):
+            return {"type": "general_query", "confidence": 0.9, "reasoning": "Long question"}
 
-            response = gemini_model.generate_content(
-                prompt, generation_config={"response_mime_type": "application/json"}
-            )
+        if CLASSIFIER_CACHE_ENABLED:
+            cached = _classifier_cache.get(query.strip().lower())
+            if cached is not None:
+                classifier_cache_stats["hits"] += 1
+                return dict(cached)
+            classifier_cache_stats["misses"] += 1
+            total = classifier_cache_stats["hits"] + classifier_cache_stats["misses"]
+            logger.debug(f"Classifier cache hit ratio: {classifier_cache_stats['hits'] / total:.2f}")
 
-            response_text = response.text.strip()
-            # Remove markdown code blocks if present
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                response_text = "\n".join(lines[1:-1]) if len(lines) > 2 else response_text
+        return None
 
-            classification = json.loads(response_text)
+    @classmethod
+    async def _classify_with_gemini(cls, query: str) -> dict[str, any]:
+        """Classify with a Gemini call, falling back to pattern matching on failure."""
+        cache_key = query.strip().lower()
+        try:
+            # Instructions live in the model's system_instruction; only the query varies.
+            # The response schema guarantees bare JSON, so no fence stripping is needed
+            response = await gemini_model.generate_content_async(f'Query: "{query}"')
+            classification = orjson.loads(response.text)
             query_type = classification.get("type", "general_query")
             confidence = classification.get("confidence", 0.5)
             reasoning = classification.get("reasoning", "")
@@ -161,7 +302,11 @@ Return JSON only with this structure:
                 f"Agentic classification: type={query_type}, confidence={confidence:.2f}, reasoning={reasoning}"
             )
 
-            return {"type": query_type, "confidence": confidence, "reasoning": reasoning}
+            classification = {"type": query_type, "confidence": confidence, "reasoning": reasoning}
+            # Only successful classifications are cached; fallbacks are retried next time
+            if CLASSIFIER_CACHE_ENABLED:
+                _classifier_cache.set(cache_key, classification)
+            return dict(classification)
 
         except Exception as e:
             logger.warning(f"Agentic classification failed: {e}, falling back to pattern matching")
@@ -173,20 +318,30 @@ Return JSON only with this structure:
         query = query.strip()
 
         # Check if it's a UUID
-        if cls.UUID_PATTERN.match(query):
+        # Length prefilter: only a 36-character query can be a UUID
+        if len(query) == 36 and cls.UUID_PATTERN.match(query):
             return {"type": "org_id", "confidence": 1.0, "reasoning": "Matches UUID pattern"}
 
-        # Check if it's a Swedish organization number
-        cleaned_org_id = re.sub(r"[-\s]", "", query)
-        if cls.SWEDISH_ORG_PATTERN.match(query) or (len(cleaned_org_id) == 10 and cleaned_org_id.isdigit()):
-            formatted = f"{cleaned_org_id[:6]}-{cleaned_org_id[6:]}"
+        # Check if it's a Swedish organization number (the pattern is covered by the digit check)
+        if cls._format_org_number(query) is not None:
             return {"type": "org_id", "confidence": 1.0, "reasoning": "Matches Swedish org number pattern"}
 
         # Default to general_query for fallback (safer to forward to Neo4j agent)
         return {"type": "general_query", "confidence": 0.3, "reasoning": "Fallback: defaulting to general query"}
 
+    @staticmethod
+    def _format_org_number(query: str) -> str | None:
+        """Format a Swedish org number as XXXXXX-XXXX, or None if the query isn't one."""
+        # Fewer than 10 characters can't hold 10 digits; skip the regex pass
+        if len(query) < 10:
+            return None
+        cleaned_org_id = normalize_org_number(query)
+        if len(cleaned_org_id) == 10 and cleaned_org_id.isdigit():
+            return f"{cleaned_org_id[:6]}-{cleaned_org_id[6:]}"
+        return None
+
     @classmethod
-    def validate_input(cls, query: str) -> dict[str, any]:
+    async def validate_input(cls, query: str) -> dict[str, any]:
         """
         Agentically validate user input and determine query type.
 
@@ -204,17 +359,13 @@ Return JSON only with this structure:
             return {"valid": False, "type": None, "cleaned": None, "error": "Empty query"}
 
         # Use agentic classification
-        classification = cls._classify_query_agentic(query)
+        classification = await cls.classify_query(query)
         query_type = classification["type"]
 
         # Clean and format based on type
         if query_type == "org_id":
-            # Format Swedish org numbers consistently
-            cleaned_org_id = re.sub(r"[-\s]", "", query)
-            if len(cleaned_org_id) == 10 and cleaned_org_id.isdigit():
-                cleaned = f"{cleaned_org_id[:6]}-{cleaned_org_id[6:]}"
-            else:
-                cleaned = query.lower()  # UUID
+            # Format Swedish org numbers consistently; anything else is a UUID
+            cleaned = cls._format_org_number(query) or query.lower()
             return {"valid": True, "type": "org_id", "cleaned": cleaned, "error": None}
 
         elif query_type == "company_name":
@@ -226,88 +377,194 @@ Return JSON only with this structure:
             return {"valid": True, "type": "general_query", "cleaned": query, "error": None}
 
 
+_NEO4J_TEMPORAL_TYPES = (DateTime, Date, Time)
+_PRIMITIVE_TYPES = frozenset((str, int, float, bool, type(None)))
+
+
+def _neo4j_to_json(obj):
+    """Convert Neo4j objects to JSON-serializable format"""
+    # Exact type checks first: node properties are almost all primitives and plain dicts/lists
+    obj_type = type(obj)
+    if obj_type in _PRIMITIVE_TYPES:
+        return obj
+    if obj_type is dict:
+        return {k: v if type(v) in _PRIMITIVE_TYPES else _neo4j_to_json(v) for k, v in obj.items()}
+    if obj_type is list:
+        return [v if type(v) in _PRIMITIVE_TYPES else _neo4j_to_json(v) for v in obj]
+    if isinstance(obj, _NEO4J_TEMPORAL_TYPES):
+        return obj.iso_format()
+    if isinstance(obj, dict):
+        return {k: _neo4j_to_json(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_neo4j_to_json(item) for item in obj]
+    # Other scalars pass through unchanged
+    return obj
+
+# Org id and name lookups in one round trip, for every lookup in the batch. Every branch
+# is label-scoped so it's an index seek (company_id constraint / name_lower index) rather
+# than a scan of every node with toLower() applied.
+_LOOKUP_CYPHER = """
+UNWIND $lookups AS lookup
+CALL {
+    WITH lookup
+    MATCH (c:Company {company_id: lookup.query}) RETURN c
+    UNION
+    WITH lookup
+    MATCH (c:Fund {company_id: lookup.query}) RETURN c
+    UNION
+    WITH lookup
+    MATCH (c:Company {name_lower: lookup.name_lower}) RETURN c
+    UNION
+    WITH lookup
+    MATCH (c:Fund {name_lower: lookup.name_lower}) RETURN c
+}
+WITH lookup.query AS query, head(collect(c)) AS c
+RETURN query, c, labels(c)[0] AS kind
+"""
+
+# Lookups arriving within this window share one query
+LOOKUP_BATCH_WINDOW = float(os.getenv("LOOKUP_BATCH_WINDOW_MS", "2")) / 1000
+# cleaned query -> future of (node properties, label) or None, for the batch being collected
+_lookup_batch: dict[str, asyncio.Future] = {}
+_lookup_flush_task: asyncio.Task | None = None
+
+
+async def _read_all(tx, query: str, **params):
+    result = await tx.run(query, **params)
+    return [record async for record in result]
+
+
+async def _lookup_entity(cleaned_query: str) -> tuple[dict, str] | None:
+    """
+    Find a Company or Fund by org id or (case-insensitive) name. Concurrent lookups are
+    collected for LOOKUP_BATCH_WINDOW and sent as one UNWIND query; identical ones share a slot.
+    """
+    global _lookup_flush_task
+    future = _lookup_batch.get(cleaned_query)
+    if future is None:
+        if not _lookup_batch:
+            _lookup_flush_task = asyncio.create_task(_flush_lookups())
+        future = asyncio.get_running_loop().create_future()
+        _lookup_batch[cleaned_query] = future
+    # Shielded so one caller going away doesn't fail the others waiting on the same key
+    return await asyncio.shield(future)
+
+
+async def _flush_lookups() -> None:
+    global _lookup_batch
+    await asyncio.sleep(LOOKUP_BATCH_WINDOW)
+    batch, _lookup_batch = _lookup_batch, {}
+    try:
+        # execute_read routes to a reader and retries transient failures
+        async with get_async_driver().session(database=get_db()) as session:
+            records = await session.execute_read(
+                _read_all, _LOOKUP_CYPHER, lookups=[{"query": q, "name_lower": q.lower()} for q in batch]
+            )
+        found = {query: (dict(node.items()), kind) for query, node, kind in records}
+        for query, future in batch.items():
+            if not future.done():
+                future.set_result(found.get(query))
+    except Exception as e:
+        for future in batch.values():
+            if not future.done():
+                future.set_exception(e)
+
+
+COMPANY_AGENT_PROMPT = "Find information about company with ID: {}"
+
+
+@functools.lru_cache(maxsize=4)
+def _agent_headers(token: str) -> dict[str, str]:
+    """
+    Request headers for the agent, built once per token. httpx copies them per request,
+    so the cached dict is never mutated.
+    """
+    return {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+
 class CompanyAgentTools:
     """Tools for the LangChain agent"""
 
     def __init__(self):
         self.neo_agent_url = NEO_AGENT_URL
 
-    def _convert_neo4j_to_json(self, obj):
-        """Convert Neo4j objects to JSON-serializable format"""
-        from neo4j.time import DateTime
+    _convert_neo4j_to_json = staticmethod(_neo4j_to_json)
 
-        if isinstance(obj, DateTime):
-            return obj.isoformat()
-        elif isinstance(obj, dict):
-            return {k: self._convert_neo4j_to_json(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._convert_neo4j_to_json(item) for item in obj]
-
-    async def search_database(self, query: str) -> str:
+    async def search_database(self, query: str, *, validated: dict | None = None) -> dict:
         """
         Search database for company by name or organization ID.
 
         Args:
             query: Company name or organization ID
+            validated: validate_input() result for query, if the caller already has it
 
         Returns:
-            JSON string with search results
+            Dict with search results
         """
 
         # Validate input
-        validation = InputValidator.validate_input(query)
+        validation = validated or await InputValidator.validate_input(query)
         if not validation["valid"]:
-            return json.dumps({"found": False, "error": validation["error"]})
+            return {"found": False, "error": validation["error"]}
 
         query_type = validation["type"]
         cleaned_query = validation["cleaned"]
 
-        try:
-            if query_type == "org_id":
-                # Search by organization ID
-                company = company_queries.get_company(cleaned_query)
-                if company:
-                    # Convert Neo4j objects to JSON-serializable format
-                    company_json = self._convert_neo4j_to_json(company)
-                    return json.dumps({"found": True, "data": company_json, "query_type": "org_id"})
-                else:
-                    return json.dumps({"found": False, "query": cleaned_query, "query_type": "org_id"})
+        cache_key = (query_type, cleaned_query)
+        cached = lookup_cache.get(cache_key) or lookup_miss_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
 
-            elif query_type == "company_name":
-                # Search by company name in Neo4j
-                from app.db.neo4j_client import get_driver
-
-                driver = get_driver()
-                with driver.session() as session:
-                    result = session.run(
-                        """
-                        MATCH (c)
-                        WHERE (c:Company OR c:Fund)
-                          AND toLower(c.name) = toLower($name)
-                        RETURN c
-                        LIMIT 1
-                        """,
-                        name=cleaned_query,
-                    )
+        result = await self._search_database_uncached(query_type, cleaned_query)
+        # Database errors are not cached
+        if result is not None and not result.get("error"):
+            (lookup_cache if result.get("found") else lookup_miss_cache).set(cache_key, result)
+            return dict(result)
+        return result
 
-                    record = result.single()
-                    if record:
-                        company_node = record["c"]
-                        # Convert node to dictionary
-                        company_dict = dict(company_node.items())
-                        # Convert Neo4j objects to JSON-serializable format
-                        company_json = self._convert_neo4j_to_json(company_dict)
-                        return json.dumps({"found": True, "data": company_json, "query_type": "company_name"})
-                    else:
-                        return json.dumps({"found": False, "query": cleaned_query, "query_type": "company_name"})
+    async def _search_database_uncached(self, query_type: str, cleaned_query: str) -> dict | None:
+        try:
+            # Org ids and names go through the same query; query_type is only reported back.
+            # Async driver, so the lookup doesn't block the event loop
+            match = await _lookup_entity(cleaned_query)
+
+            if match is not None:
+                company_props, kind = match
+                # Convert Neo4j objects to JSON-serializable format
+                company_json = self._convert_neo4j_to_json(company_props)
+                return {"found": True, "data": company_json, "query_type": query_type, "kind": kind}
+            else:
+                return {"found": False, "query": cleaned_query, "query_type": query_type}
 
         except Exception as e:
             logger.error(f"Error searching database: {e}")
-            return json.dumps({"found": False, "error": f"Database search error: {str(e)}"})
+            return {"found": False, "error": f"Database search error: {str(e)}"}
 
     async def _get_neo4j_token(self) -> str | None:
         """
-        Fetch Neo4j OAuth access token using client credentials.
+        Return the cached Neo4j OAuth access token, fetching a new one when it is
+        missing or about to expire. Concurrent callers share a single refresh.
+
+        Returns:
+            Access token or None if credentials not configured
+        """
+        if time.monotonic() < _token_cache["expires_at"] - TOKEN_REFRESH_MARGIN:
+            return _token_cache["token"]
+
+        async with _token_lock:
+            # Another request may have refreshed it while we waited
+            if time.monotonic() < _token_cache["expires_at"] - TOKEN_REFRESH_MARGIN:
+                return _token_cache["token"]
+            return await self._fetch_neo4j_token()
+
+    @staticmethod
+    def _invalidate_neo4j_token():
+        _token_cache["token"] = None
+        _token_cache["expires_at"] = 0.0
+
+    async def _fetch_neo4j_token(self) -> str | None:
+        """
+        Fetch Neo4j OAuth access token using client credentials and cache it.
 
         Returns:
             Access token or None if credentials not configured
@@ -323,28 +580,28 @@ class CompanyAgentTools:
             token_url = "https://api.neo4j.io/oauth/token"
 
             # HTTP Basic Auth: base64 encode client_id:client_secret
-            import base64
-
             credentials = base64.b64encode(f"{AURA_CLIENT_ID}:{AURA_CLIENT_SECRET}".encode()).decode()
 
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    token_url,
-                    headers={
-                        "Authorization": f"Basic {credentials}",
-                        "Content-Type": "application/x-www-form-urlencoded",
-                    },
-                    data={"grant_type": "client_credentials"},
-                )
-                response.raise_for_status()
-                token_data = response.json()
-                access_token = token_data.get("access_token")
-                if access_token:
-                    logger.info("Successfully obtained Aura API access token")
-                    return access_token
-                else:
-                    logger.error(f"Token response missing access_token: {token_data}")
-                    return None
+            response = await get_http_client().post(
+                token_url,
+                headers={
+                    "Authorization": f"Basic {credentials}",
+                    "Content-Type": "application/x-www-form-urlencoded",
+                },
+                data={"grant_type": "client_credentials"},
+                timeout=10.0,
+            )
+            response.raise_for_status()
+            token_data = response.json()
+            access_token = token_data.get("access_token")
+            if access_token:
+                logger.info("Successfully obtained Aura API access token")
+                _token_cache["token"] = access_token
+                _token_cache["expires_at"] = time.monotonic() + float(token_data.get("expires_in", 3600))
+                return access_token
+            else:
+                logger.error(f"Token response missing access_token: {token_data}")
+                return None
 
         except httpx.HTTPStatusError as e:
             logger.error(f"Aura API token endpoint returned {e.response.status_code}: {e.response.text[:200]}")
@@ -357,54 +614,80 @@ class CompanyAgentTools:
             logger.error(f"Error obtaining Aura API token: {e}", exc_info=True)
             return None
 
-    async def query_neo4j_agent(self, company_data: str) -> str:
+    async def _post_agent(self, payload: dict, token: str, timeout: float) -> httpx.Response:
+        """
+        POST a payload to the Neo4j agent. A 401 means the cached token was revoked or
+        expired early, so it is dropped and the request retried once with a fresh one.
+        """
+        client = get_http_client()
+        response = await client.post(self.neo_agent_url, json=payload, headers=_agent_headers(token), timeout=timeout)
+        if response.status_code == 401:
+            logger.info("Neo4j agent rejected the cached token, refreshing it")
+            self._invalidate_neo4j_token()
+            token = await self._get_neo4j_token()
+            if token:
+                response = await client.post(
+                    self.neo_agent_url, json=payload, headers=_agent_headers(token), timeout=timeout
+                )
+        return response
+
+    async def query_neo4j_agent(self, company_data: dict, token: str | None = None) -> dict:
         """
         Query Neo4j agent for detailed company information.
 
         Args:
-            company_data: JSON string with company data from database
+            company_data: Company data from database
+            token: Pre-fetched OAuth token; fetched here if not given
 
         Returns:
-            JSON string with Neo4j agent response
+            Dict with Neo4j agent response
         """
 
         if not self.neo_agent_url:
-            return json.dumps({"error": "NEO_AGENT_INVOKE not configured"})
+            return {"error": "NEO_AGENT_INVOKE not configured"}
+
+        # The payload only depends on the company id, so repeat lookups skip the agent
+        company_id = company_data.get("company_id") or company_data.get("organization_id")
+        cached = agent_response_cache.get(company_id) or agent_error_cache.get(company_id)
+        if cached is not None:
+            return dict(cached)
 
         # Fetch OAuth token
-        token = await self._get_neo4j_token()
+        if not token:
+            token = await self._get_neo4j_token()
         if not token:
             error_msg = "Failed to obtain Neo4j OAuth token. Check AURA_CLIENT_ID and AURA_CLIENT_SECRET."
-            return json.dumps({"error": error_msg})
+            return {"error": error_msg}
 
         try:
-            data = json.loads(company_data)
-            company_id = data.get("company_id") or data.get("organization_id")
-
-            # Prepare request with Bearer token
-            headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-
-            payload = {"input": f"Find information about company with ID: {company_id}"}
+            payload = {"input": COMPANY_AGENT_PROMPT.format(company_id)}
 
             logger.debug(f"Company query payload: {payload}")
-            logger.debug(f"Company query headers: {dict(headers)}")
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(self.neo_agent_url, json=payload, headers=headers)
-                logger.debug(f"Company query response status: {response.status_code}")
-                if response.status_code != 200:
-                    logger.debug(f"Company query response body: {response.text[:500]}")
-                response.raise_for_status()
-                return json.dumps(response.json())
+            response = await self._post_agent(payload, token, timeout=30.0)
+            logger.debug(f"Company query response status: {response.status_code}")
+            if response.status_code != 200:
+                logger.debug(f"Company query response body: {response.text[:500]}")
+            response.raise_for_status()
+            result = orjson.loads(response.content)
+            if isinstance(result, dict):
+                agent_response_cache.set(company_id, result)
+                return dict(result)
+            return result
 
         except httpx.HTTPStatusError as e:
             logger.error(f"Neo4j agent HTTP error: {e}")
-            return json.dumps({"error": f"Neo4j agent authentication failed: {e.response.status_code}"})
+            error = {"error": f"Neo4j agent authentication failed: {e.response.status_code}"}
         except Exception as e:
             logger.error(f"Error querying Neo4j agent: {e}")
-            return json.dumps({"error": f"Neo4j agent query failed: {str(e)}"})
+            error = {"error": f"Neo4j agent query failed: {str(e)}"}
+
+        # Failures are remembered only briefly: enough to stop a burst of lookups from
+        # stampeding a broken agent, short enough that recovery is picked up quickly
+        agent_error_cache.set(company_id, error)
+        return dict(error)
 
-    async def query_neo4j_agent_general(self, query: str) -> str:
+    async def query_neo4j_agent_general(self, query: str) -> dict:
         """
         Query Neo4j agent with a general question/query.
         Extracts only the final text response from the agent log.
@@ -413,97 +696,92 @@ class CompanyAgentTools:
             query: Natural language question or query
 
         Returns:
-            JSON string with extracted text response or error
+            Dict with extracted text response or error
         """
-        import json
-
         logger.info(f"Querying Neo4j agent with general query: {query}")
 
         if not self.neo_agent_url:
-            return json.dumps({"error": "NEO_AGENT_INVOKE not configured"})
+            return {"error": "NEO_AGENT_INVOKE not configured"}
 
         token = await self._get_neo4j_token()
         if not token:
             error_msg = "Failed to obtain Neo4j OAuth token. Check AURA_CLIENT_ID and AURA_CLIENT_SECRET."
-            return json.dumps({"error": error_msg})
+            return {"error": error_msg}
 
         try:
-            headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
             payload = {"input": query}
 
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(self.neo_agent_url, json=payload, headers=headers)
-                response.raise_for_status()
+            response = await self._post_agent(payload, token, timeout=60.0)
+            response.raise_for_status()
 
-                # Get the raw response
-                raw_result = response.json()
-                logger.debug(f"Raw Neo4j agent response type: {type(raw_result)}")
-                logger.debug(
-                    f"Raw Neo4j agent response keys: {raw_result.keys() if isinstance(raw_result, dict) else 'not a dict'}"
-                )
-
-                # Handle wrapper format with 'content' field
-                if isinstance(raw_result, dict) and "content" in raw_result:
-                    content = raw_result["content"]
-                    logger.debug(f"Found 'content' field, type: {type(content)}")
-
-                    # Content should be the actual log array
-                    if isinstance(content, list):
-                        final_text = extract_final_text(content)
-                        if final_text:
-                            logger.info(f"✓ Extracted final text from agent log")
-                            return json.dumps({"text": final_text})
-                        else:
-                            logger.error(f"❌ Failed to extract text from {len(content)} log items")
-                            logger.debug(f"Log items: {content}")
-                            return json.dumps({"error": "No text response found in agent log"})
-
-                    # Content might be a string already
-                    elif isinstance(content, str):
-                        logger.info(f"✓ Content is already a string")
-                        return json.dumps({"text": content})
+            # Get the raw response
+            # Agent logs can be large; orjson decodes them much faster than stdlib json
+            raw_result = orjson.loads(response.content)
+            logger.debug(f"Raw Neo4j agent response type: {type(raw_result)}")
+            logger.debug(
+                f"Raw Neo4j agent response keys: {raw_result.keys() if isinstance(raw_result, dict) else 'not a dict'}"
+            )
 
-                    else:
-                        logger.error(f"Unexpected content type: {type(content)}")
-                        return json.dumps({"error": f"Unexpected content type: {type(content)}"})
+            # Handle wrapper format with 'content' field
+            if isinstance(raw_result, dict) and "content" in raw_result:
+                content = raw_result["content"]
+                logger.debug(f"Found 'content' field, type: {type(content)}")
 
-                # Handle direct list format (original behavior)
-                elif isinstance(raw_result, list):
-                    final_text = extract_final_text(raw_result)
+                # Content should be the actual log array
+                if isinstance(content, list):
+                    final_text = extract_final_text(content)
                     if final_text:
                         logger.info(f"✓ Extracted final text from agent log")
-                        return json.dumps({"text": final_text})
+                        return {"text": final_text}
                     else:
-                        logger.error(f"❌ Failed to extract text from {len(raw_result)} log items")
-                        return json.dumps({"error": "No text response found in agent log"})
+                        logger.error(f"❌ Failed to extract text from {len(content)} log items")
+                        logger.debug(f"Log items: {content}")
+                        return {"error": "No text response found in agent log"}
 
-                # Handle direct dict with text field
-                elif isinstance(raw_result, dict) and raw_result.get("text"):
-                    logger.info(f"✓ Found direct text field")
-                    return json.dumps({"text": raw_result["text"]})
+                # Content might be a string already
+                elif isinstance(content, str):
+                    logger.info(f"✓ Content is already a string")
+                    return {"text": content}
 
                 else:
-                    logger.error(
-                        f"Unexpected response format. Keys: {list(raw_result.keys()) if isinstance(raw_result, dict) else 'not a dict'}"
-                    )
-                    return json.dumps({"error": "Invalid response format from agent"})
+                    logger.error(f"Unexpected content type: {type(content)}")
+                    return {"error": f"Unexpected content type: {type(content)}"}
+
+            # Handle direct list format (original behavior)
+            elif isinstance(raw_result, list):
+                final_text = extract_final_text(raw_result)
+                if final_text:
+                    logger.info(f"✓ Extracted final text from agent log")
+                    return {"text": final_text}
+                else:
+                    logger.error(f"❌ Failed to extract text from {len(raw_result)} log items")
+                    return {"error": "No text response found in agent log"}
+
+            # Handle direct dict with text field
+            elif isinstance(raw_result, dict) and raw_result.get("text"):
+                logger.info(f"✓ Found direct text field")
+                return {"text": raw_result["text"]}
+
+            else:
+                logger.error(
+                    f"Unexpected response format. Keys: {list(raw_result.keys()) if isinstance(raw_result, dict) else 'not a dict'}"
+                )
+                return {"error": "Invalid response format from agent"}
 
         except httpx.TimeoutException:
             logger.error(f"Neo4j agent request timed out after 60 seconds")
-            return json.dumps({"error": "Query timed out. The Neo4j agent took too long to respond."})
+            return {"error": "Query timed out. The Neo4j agent took too long to respond."}
         except httpx.HTTPStatusError as e:
             logger.error(f"Neo4j agent HTTP error: {e.response.status_code} - {e.response.text}")
-            return json.dumps(
-                {"error": f"Neo4j agent returned error {e.response.status_code}: {e.response.text[:200]}"}
-            )
+            return {"error": f"Neo4j agent returned error {e.response.status_code}: {e.response.text[:200]}"}
         except httpx.RequestError as e:
             logger.error(f"Neo4j agent request error: {e}")
-            return json.dumps({"error": f"Failed to connect to Neo4j agent: {str(e)}"})
+            return {"error": f"Failed to connect to Neo4j agent: {str(e)}"}
         except Exception as e:
             logger.error(f"Error querying Neo4j agent: {e}", exc_info=True)
-            return json.dumps({"error": f"Neo4j agent query failed: {str(e)}"})
+            return {"error": f"Neo4j agent query failed: {str(e)}"}
 
-    async def trigger_ingestion(self, query: str) -> str:
+    async def trigger_ingestion(self, query: str, *, validated: dict | None = None) -> dict:
         """
         Trigger ingestion pipeline for a company.
 
@@ -511,14 +789,15 @@ class CompanyAgentTools:
 
         Args:
             query: Organization ID or company name
+            validated: validate_input() result for query, if the caller already has it
 
         Returns:
-            JSON string with ingestion results
+            Dict with ingestion results
         """
         # Validate input
-        validation = InputValidator.validate_input(query)
+        validation = validated or await InputValidator.validate_input(query)
         if not validation["valid"]:
-            return f'{{"status": "error", "error": "{validation["error"]}"}}'
+            return {"status": "error", "error": validation["error"]}
 
         query_type = validation["type"]
         cleaned_query = validation["cleaned"]
@@ -530,48 +809,39 @@ class CompanyAgentTools:
             logger.info(f"Looking up organization number for company name: {cleaned_query}")
 
             try:
-                from app.services.portfolio_ingestion import (
-                    gemini_model,
-                    lookup_org_number_from_web,
-                    tavily_client,
-                )
-
                 # Check if Tavily and Gemini are available
-                if not tavily_client or not gemini_model:
+                if not tavily_client or not ingestion_gemini_model:
                     logger.warning("Tavily or Gemini not available - cannot lookup org number")
-                    return json.dumps(
-                        {
-                            "status": "error",
-                            "error": (
-                                f"Company '{cleaned_query}' not found -- "
-                                "Agent ingest is not possible, try again later. (Tavily/Gemini API not configured)"
-                            ),
-                        }
-                    )
+                    return {
+                        "status": "error",
+                        "error": (
+                            f"Company '{cleaned_query}' not found -- "
+                            "Agent ingest is not possible, try again later. (Tavily/Gemini API not configured)"
+                        ),
+                    }
 
-                # Use web lookup to find org number
-                organization_id = lookup_org_number_from_web(cleaned_query)
+                # Use web lookup to find org number. Tavily and Gemini are blocking clients,
+                # so keep them off the event loop
+                organization_id = await asyncio.to_thread(lookup_org_number_from_web, cleaned_query)
 
                 if not organization_id:
                     error_msg = (
                         f"Could not find organization number for company '{cleaned_query}'. "
                         "Please provide the Swedish organization number (format: XXXXXX-XXXX) manually."
                     )
-                    return f'{{"status": "error", "error": "{error_msg}"}}'
+                    return {"status": "error", "error": error_msg}
 
                 logger.info(f"Found organization number {organization_id} for {cleaned_query}")
 
             except Exception as e:
                 logger.error(f"Error looking up organization number: {e}")
-                return json.dumps(
-                    {
-                        "status": "error",
-                        "error": (
-                            f"Company '{cleaned_query}' not found -- "
-                            f"Agent ingest is not possible, try again later. (Error: {str(e)})"
-                        ),
-                    }
-                )
+                return {
+                    "status": "error",
+                    "error": (
+                        f"Company '{cleaned_query}' not found -- "
+                        f"Agent ingest is not possible, try again later. (Error: {str(e)})"
+                    ),
+                }
         else:
             # Already have org ID
             organization_id = cleaned_query
@@ -581,29 +851,26 @@ class CompanyAgentTools:
             logger.info(f"Starting ingestion for {organization_id} ({cleaned_query})")
 
             # Run ingestion in thread pool
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor() as executor:
-                result = await loop.run_in_executor(
-                    executor, ingest_company_with_portfolio, organization_id, cleaned_query
-                )
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                INGEST_EXECUTOR, ingest_company_with_portfolio, organization_id, cleaned_query
+            )
 
             logger.info(
                 f"Ingestion completed for {organization_id}: {len(result['portfolio'])} portfolio companies found"
             )
 
-            return json.dumps(
-                {
-                    "status": "completed",
-                    "organization_id": result["organization_id"],
-                    "portfolio_companies_found": len(result["portfolio"]),
-                    "companies_processed": result["companies_processed"],
-                }
-            )
+            return {
+                "status": "completed",
+                "organization_id": result["organization_id"],
+                "portfolio_companies_found": len(result["portfolio"]),
+                "companies_processed": result["companies_processed"],
+            }
 
         except Exception as e:
             logger.error(f"Error during ingestion for {organization_id}: {e}")
 
-            return json.dumps({"status": "error", "error": str(e), "organization_id": organization_id})
+            return {"status": "error", "error": str(e), "organization_id": organization_id}
 
 
 class AgentResponse:
@@ -628,7 +895,7 @@ class AgentResponse:
                         message = str(item["text"])
                         break
                 else:
-                    message = json.dumps(message)  # Fallback: stringify the list
+                    message = orjson.dumps(message).decode()  # Fallback: stringify the list
             else:
                 message = str(message)
 
@@ -650,6 +917,10 @@ class AgentResponse:
         }
 
 
+# (query type, cleaned query) -> future of the AgentResponse currently being produced
+_process_inflight: dict[tuple[str, str], asyncio.Future] = {}
+
+
 async def process_query(query: str) -> AgentResponse:
     """
     Process user query using LangChain agent.
@@ -667,15 +938,42 @@ async def process_query(query: str) -> AgentResponse:
     Returns:
         AgentResponse with results
     """
-    import json  # ← Move import to the TOP of the function
-
     logger.info(f"Processing query: {query}")
 
     # Step 1: Validate input
-    validation = InputValidator.validate_input(query)
+    validation = await InputValidator.validate_input(query)
     if not validation["valid"]:
         return AgentResponse(message=validation["error"], company_found=False, error=validation["error"])
 
+    # Concurrent requests for the same query share one pipeline run (search, agent call,
+    # ingestion) instead of each doing the work
+    key = (validation["type"], validation["cleaned"])
+    pending = _process_inflight.get(key)
+    if pending is not None:
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            # The request that owned the run went away; process on our own
+            if not pending.cancelled():
+                raise
+
+    pending = asyncio.get_running_loop().create_future()
+    _process_inflight[key] = pending
+    try:
+        response = await _answer_query(validation)
+        pending.set_result(response)
+        return response
+    except BaseException:
+        pending.cancel()
+        raise
+    finally:
+        # After an owner is cancelled, waiters each register their own run; only drop ours
+        if _process_inflight.get(key) is pending:
+            del _process_inflight[key]
+
+
+async def _answer_query(validation: dict) -> AgentResponse:
+    """Run steps 2-5 of process_query for an already validated query."""
     query_type = validation["type"]
     cleaned_query = validation["cleaned"]
 
@@ -686,41 +984,32 @@ async def process_query(query: str) -> AgentResponse:
         if query_type == "general_query":
             logger.info(f"Processing as general query: {cleaned_query}")
 
-            # Query Neo4j agent - now returns simplified {"text": "..."} format
-            neo4j_result_str = await tools.query_neo4j_agent_general(cleaned_query)
-
-            try:
-                neo4j_result = json.loads(neo4j_result_str)
-
-                # Check for error
-                if neo4j_result.get("error"):
-                    return AgentResponse(
-                        message=f"Error: {neo4j_result['error']}",
-                        company_found=False,
-                        error=neo4j_result["error"],
-                    )
-
-                # Extract text from simplified response
-                message = neo4j_result.get("text", "No response text found.")
-                logger.info(f"✓ Received text response (length: {len(message)})")
+            # Query Neo4j agent - returns simplified {"text": "..."} format
+            neo4j_result = await tools.query_neo4j_agent_general(cleaned_query)
 
+            # Check for error
+            if neo4j_result.get("error"):
                 return AgentResponse(
-                    message=message,
+                    message=f"Error: {neo4j_result['error']}",
                     company_found=False,
-                    company_data=None,
+                    error=neo4j_result["error"],
                 )
 
-            except json.JSONDecodeError:
-                # If not JSON, return as plain text
-                return AgentResponse(
-                    message=str(neo4j_result_str),
-                    company_found=False,
-                    company_data=None,
-                )
+            # Extract text from simplified response
+            message = neo4j_result.get("text", "No response text found.")
+            logger.info(f"✓ Received text response (length: {len(message)})")
+
+            return AgentResponse(
+                message=message,
+                company_found=False,
+                company_data=None,
+            )
 
-        # Step 3: For company_name/org_id, search database
-        search_result_str = await tools.search_database(cleaned_query)
-        search_result = json.loads(search_result_str)
+        # Step 3: For company_name/org_id, search database. The agent token is fetched
+        # in parallel, so a hit doesn't pay for the OAuth round-trip afterwards
+        token_task = asyncio.create_task(tools._get_neo4j_token()) if tools.neo_agent_url else None
+        # Pass the validation along so the tools don't classify the query again
+        search_result = await tools.search_database(cleaned_query, validated=validation)
 
         # Step 4: If found, query Neo4j agent
         if search_result.get("found"):
@@ -728,73 +1017,75 @@ async def process_query(query: str) -> AgentResponse:
             company_name = company_data.get("name", "Unknown")
             company_id = company_data.get("company_id") or company_data.get("organization_id", "N/A")
 
-            # Build detailed company info in markdown
-            company_details = f"## ✓ Company Found: **{company_name}**\n\n"
-            company_details += f"**Organization ID:** `{company_id}`\n\n"
+            # Build detailed company info in markdown, joined once at the end
+            parts = [f"## ✓ Company Found: **{company_name}**\n\n", f"**Organization ID:** `{company_id}`\n\n"]
+
+            # Each field is read once, for both the check and the output
+            description = company_data.get("description")
+            sectors = company_data.get("sectors")
+            website = company_data.get("website")
+            year_founded = company_data.get("year_founded")
+            num_employees = company_data.get("num_employees")
+            country_code = company_data.get("country_code")
 
-            if company_data.get("description"):
-                company_details += f"**Description:**\n{company_data['description']}\n\n"
+            if description:
+                parts.append(f"**Description:**\n{description}\n\n")
 
-            if company_data.get("sectors") and len(company_data["sectors"]) > 0:
-                sectors = company_data["sectors"]
+            if sectors:
                 if isinstance(sectors, list):
-                    company_details += f"**Sectors:** {', '.join(sectors)}\n\n"
+                    parts.append(f"**Sectors:** {', '.join(sectors)}\n\n")
                 else:
-                    company_details += f"**Sectors:** {sectors}\n\n"
-
-            details_added = False
-            if company_data.get("website"):
-                company_details += f"**Website:** [{company_data['website']}]({company_data['website']})\n"
-                details_added = True
-            if company_data.get("year_founded"):
-                company_details += f"**Founded:** {company_data['year_founded']}\n"
-                details_added = True
-            if company_data.get("num_employees"):
-                company_details += f"**Employees:** {company_data['num_employees']}\n"
-                details_added = True
-            if company_data.get("country_code"):
-                company_details += f"**Country:** {company_data['country_code']}\n"
-                details_added = True
-
-            if details_added:
-                company_details += "\n"
+                    parts.append(f"**Sectors:** {sectors}\n\n")
+
+            details_start = len(parts)
+            if website:
+                parts.append(f"**Website:** [{website}]({website})\n")
+            if year_founded:
+                parts.append(f"**Founded:** {year_founded}\n")
+            if num_employees:
+                parts.append(f"**Employees:** {num_employees}\n")
+            if country_code:
+                parts.append(f"**Country:** {country_code}\n")
+
+            if len(parts) > details_start:
+                parts.append("\n")
 
             # Query Neo4j agent for additional information
             logger.info(f"Querying Neo4j agent for additional info about {company_name} ({company_id})")
-            neo4j_result_str = await tools.query_neo4j_agent(json.dumps(company_data))
+            token = await token_task if token_task else None
+            neo4j_result = await tools.query_neo4j_agent(company_data, token=token)
 
-            try:
-                neo4j_result = json.loads(neo4j_result_str)
-            except json.JSONDecodeError as e:
-                logger.warning(f"Neo4j agent response is not JSON: {e}, using database data only")
-                company_details += "*Showing information from our database.*"
+            if not isinstance(neo4j_result, dict):
+                logger.warning("Neo4j agent response is not an object, using database data only")
+                parts.append("*Showing information from our database.*")
                 return AgentResponse(
-                    message=company_details,
+                    message="".join(parts),
                     company_found=True,
                     company_data=company_data,
                 )
 
             if neo4j_result.get("error"):
                 logger.warning(f"Neo4j agent returned error: {neo4j_result.get('error')}, using database data only")
-                company_details += "*Showing information from our database.*"
+                parts.append("*Showing information from our database.*")
                 return AgentResponse(
-                    message=company_details,
+                    message="".join(parts),
                     company_found=True,
                     company_data=company_data,
                 )
 
             logger.info(f"Neo4j agent provided additional insights for {company_name}")
-            company_details += "*Additional insights from our knowledge graph...*"
+            parts.append("*Additional insights from our knowledge graph...*")
             return AgentResponse(
-                message=company_details,
+                message="".join(parts),
                 company_found=True,
                 company_data=neo4j_result.get("data", company_data),
             )
 
         # Step 5: Not found - trigger ingestion
+        if token_task:
+            token_task.cancel()
         logger.info(f"Company not found with query '{cleaned_query}' - triggering ingestion")
-        ingestion_result_str = await tools.trigger_ingestion(cleaned_query)
-        ingestion_result = json.loads(ingestion_result_str)
+        ingestion_result = await tools.trigger_ingestion(cleaned_query, validated=validation)
 
         if ingestion_result.get("status") == "completed":
             portfolio_count = ingestion_result.get("portfolio_companies_found", 0)
@@ -2,12 +2,27 @@
 Company data extraction service that combines FI report data and web search.
 Extracts company fields from both sources and merges them.
 """
+import functools
+import hashlib
+import json
 import logging
 import os
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Report and web extraction are independent blocking API calls; the report side runs
+# here while the calling thread does the web side
+EXTRACT_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="extract")
+# Companies extracted at once by extract_many; bounds concurrent Gemini/Tavily calls so a
+# large portfolio stays under the API rate limits. Separate from EXTRACT_EXECUTOR, which
+# each of these workers uses for its report half.
+EXTRACT_CONCURRENCY = int(os.getenv("EXTRACT_CONCURRENCY", "4"))
+_BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=EXTRACT_CONCURRENCY, thread_name_prefix="extract-batch")
+
 # Try to import Tavily for web search
 try:
     from tavily import TavilyClient
@@ -23,24 +38,158 @@ except ImportError:
     tavily_client = None
     logger.warning("Tavily not available - web search extraction disabled")
 
+# Extraction results keyed by a hash of the inputs, so re-ingesting a company skips the
+# Gemini/Tavily round-trips. On disk (shared across runs and workers) when diskcache is
+# installed and the directory is writable, otherwise in-process. NL_EXTRACT_CACHE=0 disables it.
+EXTRACT_CACHE_ENABLED = os.getenv("NL_EXTRACT_CACHE", "1") != "0"
+EXTRACT_CACHE_DIR = os.getenv("NL_EXTRACT_CACHE_DIR", "/var/cache/nl_extract")
+EXTRACT_CACHE_TTL = float(os.getenv("NL_EXTRACT_CACHE_TTL", str(7 * 24 * 3600)))
+
+try:
+    import diskcache
+
+    _extract_cache = diskcache.Cache(EXTRACT_CACHE_DIR)
+except ImportError:
+    _extract_cache = TTLCache(maxsize=2_000, ttl=EXTRACT_CACHE_TTL)
+except OSError as e:
+    logger.warning(f"Extraction cache directory {EXTRACT_CACHE_DIR} not usable ({e}), caching in memory")
+    _extract_cache = TTLCache(maxsize=2_000, ttl=EXTRACT_CACHE_TTL)
+
+
+def _cached_extraction(fn):
+    """
+    Cache an extractor's non-empty results under a hash of its name and arguments.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not EXTRACT_CACHE_ENABLED:
+            return fn(*args, **kwargs)
+        parts = (fn.__name__, *map(str, args), *(f"{k}={v}" for k, v in sorted(kwargs.items())))
+        key = hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest()
+        cached = _extract_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+        result = fn(*args, **kwargs)
+        # Failed extractions come back empty and are retried next time
+        if result:
+            if isinstance(_extract_cache, TTLCache):
+                _extract_cache.set(key, result)
+            else:
+                _extract_cache.set(key, result, expire=EXTRACT_CACHE_TTL)
+        return result
+
+    return wrapper
+
+
+# Fixed extraction instructions, sent as each model's system instruction so the per-call
+# prompt is just the company and its source text, and the shared prefix can be cached
+REPORT_SYSTEM_PROMPT = """You are analyzing Swedish annual reports.
+
+Extract the following company information from the report you are given:
+- description: Short executive summary (2-3 sentences) about what the company does
+- mission: Company mission statement or core purpose
+- sectors: List of industry sectors/categories the company operates in
+- website: Official company website URL (if mentioned)
+- num_employees: Number of employees (if mentioned)
+- year_founded: Year the company was founded (if mentioned)
+- key_people: List of key executives, founders, or board members (names only)
+- aliases: Alternative names, brand names, or abbreviations used for this company
+
+Return a JSON object with these fields. Use null for fields not found in the report.
+"""
+
+WEB_SYSTEM_PROMPT = """You are analyzing web search results to extract company information.
+
+Extract the following fields from the search results you are given:
+- description: Short executive summary (2-3 sentences) about what the company does
+- mission: Company mission statement or core purpose
+- sectors: List of industry sectors/categories the company operates in
+- website: Official company website URL
+- num_employees: Number of employees (as integer, or null if not found)
+- year_founded: Year the company was founded (as string, or null if not found)
+- key_people: List of key executives, founders, or board members (names only)
+- aliases: Alternative names, brand names, or abbreviations used for this company
+
+Return a JSON object with these fields. Use null for fields not found.
+"""
+
+EXTRACTION_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
 # Try to import Gemini
 try:
     import google.generativeai as genai
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     if GEMINI_API_KEY:
         genai.configure(api_key=GEMINI_API_KEY)
-        try:
-            gemini_model = genai.GenerativeModel("gemini-2.0-flash-exp")
-        except:
-            gemini_model = genai.GenerativeModel("gemini-1.5-pro")
+
+        def _build_model(system_instruction: str):
+            try:
+                return genai.GenerativeModel(
+                    "gemini-2.0-flash-exp",
+                    system_instruction=system_instruction,
+                    generation_config=EXTRACTION_GENERATION_CONFIG,
+                )
+            except:
+                return genai.GenerativeModel(
+                    "gemini-1.5-pro",
+                    system_instruction=system_instruction,
+                    generation_config=EXTRACTION_GENERATION_CONFIG,
+                )
+
+        report_model = _build_model(REPORT_SYSTEM_PROMPT)
+        web_model = _build_model(WEB_SYSTEM_PROMPT)
     else:
-        gemini_model = None
+        report_model = web_model = None
         logger.warning("GEMINI_API_KEY not set - Gemini extraction will be disabled")
 except ImportError:
-    gemini_model = None
+    report_model = web_model = None
     logger.warning("Gemini not available - AI extraction disabled")
 
 
+def _json_object_closed(text: str, state: list) -> bool:
+    """
+    Scan the next chunk of a streamed JSON response. `state` is [depth, in_string, escaped],
+    updated in place; returns True once the top-level object or array has closed.
+    """
+    depth, in_string, escaped = state
+    closed = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                closed = True
+                break
+    state[:] = depth, in_string, escaped
+    return closed
+
+
+def _generate_json_text(model, prompt: str) -> str:
+    """
+    Stream a Gemini JSON response and stop reading as soon as the top-level value closes,
+    instead of waiting for the whole generation to finish.
+    """
+    chunks = []
+    state = [0, False, False]
+    for chunk in model.generate_content(prompt, stream=True):
+        chunks.append(chunk.text)
+        if _json_object_closed(chunk.text, state):
+            break
+    return "".join(chunks).strip()
+
+
+@_cached_extraction
 def extract_company_data_from_report(report_text: str, company_name: str, organization_id: str) -> Dict[str, Any]:
     """
     Extract company fields from FI annual report text using Gemini.
@@ -53,41 +202,25 @@ def extract_company_data_from_report(report_text: str, company_name: str, organi
     Returns:
         Dict with extracted company fields
     """
-    if not gemini_model:
+    if not report_model:
         logger.warning("Gemini not available, skipping report extraction")
         return {}
     
     try:
-        prompt = f"""You are analyzing a Swedish annual report for {company_name} (Organization ID: {organization_id}).
-
-Extract the following company information from this report:
-- description: Short executive summary (2-3 sentences) about what the company does
-- mission: Company mission statement or core purpose
-- sectors: List of industry sectors/categories the company operates in
-- website: Official company website URL (if mentioned)
-- num_employees: Number of employees (if mentioned)
-- year_founded: Year the company was founded (if mentioned)
-- key_people: List of key executives, founders, or board members (names only)
-- aliases: Alternative names, brand names, or abbreviations used for this company
-
-Return a JSON object with these fields. Use null for fields not found in the report.
-
-Report content:
-{report_text[:50000]}  # Limit to avoid token limits
-"""
-        
-        response = gemini_model.generate_content(
-            prompt,
-            generation_config={"response_mime_type": "application/json"}
+        # Instructions live in the model's system_instruction; only the company and report vary
+        prompt = (
+            f"Company: {company_name} (Organization ID: {organization_id})\n\n"
+            f"Report content:\n{report_text[:50000]}"  # Limit to avoid token limits
         )
-        
-        response_text = response.text.strip()
-        # Remove markdown code blocks if present
+
+        response_text = _generate_json_text(report_model, prompt)
+        # Remove a markdown code fence if present (the closing one is usually cut off by the stream)
         if response_text.startswith("```"):
-            lines = response_text.split("\n")
-            response_text = "\n".join(lines[1:-1]) if len(lines) > 2 else response_text
+            lines = response_text.split("\n")[1:]
+            if lines and lines[-1].startswith("```"):
+                lines.pop()
+            response_text = "\n".join(lines)
         
-        import json
         extracted_data = json.loads(response_text)
         # Ensure we return a dict
         if not isinstance(extracted_data, dict):
@@ -105,6 +238,7 @@ Report content:
         return {}
 
 
+@_cached_extraction
 def extract_company_data_from_web(company_name: str, organization_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Extract company fields from web search using Tavily and Gemini.
@@ -116,7 +250,7 @@ def extract_company_data_from_web(company_name: str, organization_id: Optional[s
     Returns:
         Dict with extracted company fields
     """
-    if not tavily_client or not gemini_model:
+    if not tavily_client or not web_model:
         logger.warning("Tavily or Gemini not available, skipping web extraction")
         return {}
     
@@ -147,36 +281,19 @@ def extract_company_data_from_web(company_name: str, organization_id: Optional[s
             return {}
         
         # Use Gemini to extract structured data
-        prompt = f"""You are analyzing web search results to extract company information for {company_name}.
-
-Extract the following fields from the search results:
-- description: Short executive summary (2-3 sentences) about what the company does
-- mission: Company mission statement or core purpose
-- sectors: List of industry sectors/categories the company operates in
-- website: Official company website URL
-- num_employees: Number of employees (as integer, or null if not found)
-- year_founded: Year the company was founded (as string, or null if not found)
-- key_people: List of key executives, founders, or board members (names only)
-- aliases: Alternative names, brand names, or abbreviations used for this company
-
-Return a JSON object with these fields. Use null for fields not found.
-
-Search results:
-{chr(10).join(search_context[:5])}  # Use top 5 results
-"""
-        
-        response = gemini_model.generate_content(
-            prompt,
-            generation_config={"response_mime_type": "application/json"}
+        prompt = (
+            f"Company: {company_name}\n\n"
+            f"Search results:\n{chr(10).join(search_context[:5])}"  # Use top 5 results
         )
-        
-        response_text = response.text.strip()
-        # Remove markdown code blocks if present
+
+        response_text = _generate_json_text(web_model, prompt)
+        # Remove a markdown code fence if present (the closing one is usually cut off by the stream)
         if response_text.startswith("```"):
-            lines = response_text.split("\n")
-            response_text = "\n".join(lines[1:-1]) if len(lines) > 2 else response_text
+            lines = response_text.split("\n")[1:]
+            if lines and lines[-1].startswith("```"):
+                lines.pop()
+            response_text = "\n".join(lines)
         
-        import json
         extracted_data = json.loads(response_text)
         # Ensure we return a dict
         if not isinstance(extracted_data, dict):
@@ -223,6 +340,31 @@ def normalize_website_url(website: str) -> str:
     return f"https://www.{website}"
 
 
+# How each extracted field is merged: "scalar" takes the report value and falls back to web,
+# "union" combines both sources' lists (report items first, duplicates dropped)
+MERGE_SPEC = {
+    "description": "scalar",
+    "mission": "scalar",
+    "sectors": "union",
+    "website": "scalar",
+    "num_employees": "scalar",
+    "year_founded": "scalar",
+    "key_people": "union",
+    "aliases": "union",
+}
+
+
+def _nonempty(value: Any) -> bool:
+    """None, blank strings and empty lists count as missing; 0 and False are real values."""
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return bool(value.strip())
+    if isinstance(value, list):
+        return bool(value)
+    return True
+
+
 def merge_company_data(report_data: Dict[str, Any], web_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Merge company data from report and web search, prioritizing report data.
@@ -235,49 +377,30 @@ def merge_company_data(report_data: Dict[str, Any], web_data: Dict[str, Any]) ->
         Merged company data dict
     """
     merged = {}
-    
-    # Fields to merge (report takes priority, web as fallback)
-    fields = ["description", "mission", "sectors", "website", "num_employees", 
-              "year_founded", "key_people", "aliases"]
-    
-    for field in fields:
-        # Report data takes priority if it exists and is not empty
-        if field in report_data and report_data[field] is not None:
-            if isinstance(report_data[field], list):
-                if report_data[field]:  # Non-empty list
-                    merged[field] = report_data[field]
-                elif field in web_data and web_data[field]:
-                    merged[field] = web_data[field]
-            elif isinstance(report_data[field], str):
-                if report_data[field].strip():  # Non-empty string
-                    merged[field] = report_data[field]
-                elif field in web_data and web_data[field]:
-                    merged[field] = web_data[field]
-            else:
-                merged[field] = report_data[field]
-        elif field in web_data and web_data[field] is not None:
-            merged[field] = web_data[field]
-    
+    report_get = report_data.get
+    web_get = web_data.get
+
+    for field, kind in MERGE_SPEC.items():
+        report_value = report_get(field)
+        web_value = web_get(field)
+
+        if kind == "union" and isinstance(report_value, list) and isinstance(web_value, list):
+            # Membership test instead of a set: items may be unhashable (e.g. dicts)
+            combined = []
+            for item in (*report_value, *web_value):
+                if item not in combined:
+                    combined.append(item)
+            if combined:
+                merged[field] = combined
+        elif _nonempty(report_value):
+            merged[field] = report_value
+        elif _nonempty(web_value):
+            merged[field] = web_value
+
     # Normalize website URL if present
-    if "website" in merged and merged["website"]:
+    if merged.get("website"):
         merged["website"] = normalize_website_url(merged["website"])
-    
-    # For sectors and key_people, merge lists from both sources
-    if "sectors" in report_data and "sectors" in web_data:
-        report_sectors = set(report_data.get("sectors", []) or [])
-        web_sectors = set(web_data.get("sectors", []) or [])
-        merged["sectors"] = list(report_sectors.union(web_sectors))
-    
-    if "key_people" in report_data and "key_people" in web_data:
-        report_people = set(report_data.get("key_people", []) or [])
-        web_people = set(web_data.get("key_people", []) or [])
-        merged["key_people"] = list(report_people.union(web_people))
-    
-    if "aliases" in report_data and "aliases" in web_data:
-        report_aliases = set(report_data.get("aliases", []) or [])
-        web_aliases = set(web_data.get("aliases", []) or [])
-        merged["aliases"] = list(report_aliases.union(web_aliases))
-    
+
     return merged
 
 
@@ -293,15 +416,13 @@ def extract_company_fields(company_name: str, organization_id: str, report_text:
     Returns:
         Dict with all extracted company fields
     """
-    report_data = {}
+    # Start the report extraction first so it overlaps with the web search below
+    report_future = None
     if report_text:
         logger.info(f"Extracting company data from report for {company_name}")
-        try:
-            report_data = extract_company_data_from_report(report_text, company_name, organization_id)
-            logger.info(f"Report extraction returned {len(report_data)} fields: {list(report_data.keys())}")
-        except Exception as e:
-            logger.error(f"Error extracting from report for {company_name}: {e}", exc_info=True)
-            report_data = {}
+        report_future = EXTRACT_EXECUTOR.submit(
+            extract_company_data_from_report, report_text, company_name, organization_id
+        )
     
     logger.info(f"Extracting company data from web search for {company_name}")
     web_data = {}
@@ -316,8 +437,38 @@ def extract_company_fields(company_name: str, organization_id: str, report_text:
         logger.error(f"Error extracting from web for {company_name}: {e}", exc_info=True)
         web_data = {}
     
+    report_data = {}
+    if report_future is not None:
+        try:
+            report_data = report_future.result()
+            logger.info(f"Report extraction returned {len(report_data)} fields: {list(report_data.keys())}")
+        except Exception as e:
+            logger.error(f"Error extracting from report for {company_name}: {e}", exc_info=True)
+            report_data = {}
+    
     merged_data = merge_company_data(report_data, web_data)
     logger.info(f"Merged company data for {company_name}: {len(merged_data)} fields - {list(merged_data.keys())}")
     
     return merged_data
 
+
+def extract_many(items: List[Tuple[str, str, Optional[str]]]) -> List[Dict[str, Any]]:
+    """
+    Run extract_company_fields for many companies concurrently, at most
+    EXTRACT_CONCURRENCY at a time.
+
+    Args:
+        items: (company_name, organization_id, report_text) per company
+
+    Returns:
+        Extracted fields per company, in the order of items ({} if extraction failed)
+    """
+    futures = [_BATCH_EXECUTOR.submit(extract_company_fields, *item) for item in items]
+    results = []
+    for (company_name, _, _), future in zip(items, futures):
+        try:
+            results.append(future.result())
+        except Exception as e:
+            logger.error(f"Error extracting company fields for {company_name}: {e}", exc_info=True)
+            results.append({})
+    return results
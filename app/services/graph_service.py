@@ -1,6 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 from sentence_transformers import SentenceTransformer
-from app.db.neo4j_client import get_driver
+from app.db.neo4j_client import get_driver, get_db
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+# Texts per forward pass inside SentenceTransformer.encode; accelerators take bigger batches
+ENCODE_BATCH_SIZE = 256
+ENCODE_BATCH_SIZE_GPU = 512
+
+
+def _pick_device() -> str:
+    """
+    Best available torch device for the encoder: CUDA, then Apple MPS, then CPU.
+    """
+    if torch is None:
+        return "cpu"
+    if torch.cuda.is_available():
+        return "cuda"
+    mps = getattr(torch.backends, "mps", None)
+    if mps is not None and mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+# Label-scoped branches so each match is a seek on the company_id uniqueness constraints.
+# Embeddings live only in `vector` (what the vector index covers); `_embedding` copies
+# written by earlier versions are dropped on the way.
+EMBEDDING_UPDATE_QUERY = """
+UNWIND $updates AS update
+CALL {
+    WITH update
+    MATCH (n:Company {company_id: update.company_id})
+    RETURN n
+    UNION
+    WITH update
+    MATCH (n:Fund {company_id: update.company_id})
+    RETURN n
+}
+SET n.vector = update.embedding
+REMOVE n._embedding
+"""
+
+
+# Fields of a node's embedding text, in order: (prefix, key, is_list). Missing and empty
+# fields are left out entirely.
+EMBEDDING_TEXT_FIELDS = (
+    ("Name: ", "name", False),
+    ("ID: ", "company_id", False),
+    ("Aliases: ", "aliases", True),
+    ("Description: ", "description", False),
+    ("Mission: ", "mission", False),
+    ("Sectors: ", "sectors", True),
+    ("Country: ", "country_code", False),
+    ("Year Founded: ", "year_founded", False),
+    ("Employees: ", "num_employees", False),
+    ("Key People: ", "key_people", True),
+    ("Investment Thesis: ", "investment_thesis", False),
+    ("Website: ", "website", False),
+    # Include portfolio names if available
+    ("Portfolio: ", "portfolio", True),
+)
+
+
+def _write_embeddings(tx, updates: List[Dict[str, Any]]) -> None:
+    tx.run(EMBEDDING_UPDATE_QUERY, updates=updates).consume()
 
 
 class GraphService:
@@ -8,11 +75,20 @@ class GraphService:
         self.model_name = model_name
         self._model = None
         self._driver = None
+        self._encode_batch_size = ENCODE_BATCH_SIZE
 
     @property
     def model(self):
         if self._model is None:
-            self._model = SentenceTransformer(self.model_name)
+            device = _pick_device()
+            model = SentenceTransformer(self.model_name, device=device)
+            if device == "cuda":
+                # FP16 halves activation memory and runs on tensor cores; embeddings are
+                # normalized afterwards so the precision loss doesn't matter for cosine kNN
+                model.half()
+            if device != "cpu":
+                self._encode_batch_size = ENCODE_BATCH_SIZE_GPU
+            self._model = model
         return self._model
 
     @property
@@ -25,41 +101,28 @@ class GraphService:
         """
         Construct a single string representation of the node for embedding.
         """
-
-        # Helper to safely get list or string and format
-        def safe_get(key: str) -> str:
-            val = node_data.get(key)
+        get = node_data.get
+        parts = []
+        append = parts.append
+        for prefix, key, is_list in EMBEDDING_TEXT_FIELDS:
+            val = get(key)
             if val is None:
-                return ""
-            if isinstance(val, list):
-                # Handle list of complex objects (dicts) or strings
-                if val and isinstance(val[0], dict):
-                    # If it's a list of EntityRefs or similar dicts, maybe just extract names?
-                    # For now, let's just stringify.
-                    # Better: extract names if available.
-                    return ", ".join([str(v.get("name", v)) for v in val])
-                return ", ".join([str(v) for v in val])
-            return str(val)
-
-        parts = [
-            f"Name: {node_data.get('name', '')}",
-            f"ID: {node_data.get('company_id', '')}",
-            f"Aliases: {safe_get('aliases')}",
-            f"Description: {node_data.get('description', '')}",
-            f"Mission: {node_data.get('mission', '')}",
-            f"Sectors: {safe_get('sectors')}",
-            f"Country: {node_data.get('country_code', '')}",
-            f"Year Founded: {node_data.get('year_founded', '')}",
-            f"Employees: {node_data.get('num_employees', '')}",
-            f"Key People: {safe_get('key_people')}",
-            f"Investment Thesis: {node_data.get('investment_thesis', '')}",
-            f"Website: {node_data.get('website', '')}",
-            # Include portfolio names if available
-            f"Portfolio: {safe_get('portfolio')}",
-        ]
-        return ". ".join(filter(lambda x: len(x.split(": ", 1)[1]) > 0, parts))
-
-    def generate_and_store_embeddings(self, batch_size: int = 100):
+                continue
+            if is_list and type(val) is list:
+                if not val:
+                    continue
+                # Lists of EntityRefs or similar dicts contribute their names
+                if type(val[0]) is dict:
+                    text = ", ".join([str(v.get("name", v)) for v in val])
+                else:
+                    text = ", ".join(map(str, val))
+            else:
+                text = str(val)
+            if text:
+                append(prefix + text)
+        return ". ".join(parts)
+
+    def generate_and_store_embeddings(self, batch_size: int = 1000):
         """
         Fetch all Company and Fund nodes, generate embeddings, and write them back to Neo4j.
         """
@@ -85,57 +148,67 @@ class GraphService:
                n.investment_thesis as investment_thesis
         """
 
-        with self.driver.session() as session:
+        with self.driver.session(database=get_db()) as session:
             result = session.run(query_fetch)
             nodes_data = [dict(record) for record in result]
 
+        # Clean data (ensure lists are lists). Nodes without a company_id can't be written back,
+        # so they aren't worth encoding either
+        for d in nodes_data:
+            for field in ["sectors", "aliases", "portfolio", "shareholders", "customers", "key_people"]:
+                if d.get(field) is None:
+                    d[field] = []
+        nodes_data = [d for d in nodes_data if d.get("company_id")]
+
         if not nodes_data:
             print("No nodes found for embedding generation.")
             return
 
-        # Process in batches
-        for i in range(0, len(nodes_data), batch_size):
-            batch_data = nodes_data[i : i + batch_size]
-
-            # Clean data (ensure lists are lists)
-            processed_batch = []
-            for d in batch_data:
-                # Sanitize list fields
-                for field in [
-                    "sectors",
-                    "aliases",
-                    "portfolio",
-                    "shareholders",
-                    "customers",
-                    "key_people",
-                ]:
-                    if d.get(field) is None:
-                        d[field] = []
-                processed_batch.append(d)
-
-            texts = [self._generate_embedding_text(node) for node in processed_batch]
-            embeddings = self.model.encode(texts)
-
-            # Update back to Neo4j
-            update_query = """
-            UNWIND $updates as update
-            MATCH (n {company_id: update.company_id})
-            SET n._embedding = update.embedding, n.vector = update.embedding
-            """
-
-            updates = []
-            for node_data, embedding in zip(processed_batch, embeddings):
-                if node_data.get("company_id"):
-                    updates.append({"company_id": node_data["company_id"], "embedding": embedding.tolist()})
-
-            if updates:
-                with self.driver.session() as session:
-                    session.run(update_query, updates=updates)
-                print(f"Processed batch {i // batch_size + 1}: {len(updates)} nodes updated.")
+        # Pipeline the work per chunk of batch_size nodes: while a chunk is being encoded, the
+        # next chunk's texts are built and the previous chunk's write runs on the pool. SBERT
+        # still does its own batching within a chunk; vectors are normalized so cosine
+        # similarity is a dot product. Writes stay sequential on the one session.
+        chunks = [nodes_data[i : i + batch_size] for i in range(0, len(nodes_data), batch_size)]
+        model = self.model  # loads the model and settles the device batch size
+
+        def build_texts(chunk: List[Dict[str, Any]]) -> List[str]:
+            return [self._generate_embedding_text(node) for node in chunk]
+
+        # The pool is entered last so it exits first: a pending write finishes before the
+        # session closes, even when encoding fails
+        with self.driver.session(database=get_db()) as session, ThreadPoolExecutor(max_workers=2) as pool:
+
+            def write(batch_number: int, updates: List[Dict[str, Any]]) -> None:
+                session.execute_write(_write_embeddings, updates)
+                print(f"Processed batch {batch_number}: {len(updates)} nodes updated.")
+
+            next_texts = pool.submit(build_texts, chunks[0])
+            pending_write = None
+            for batch_number, chunk in enumerate(chunks, 1):
+                texts = next_texts.result()
+                if batch_number < len(chunks):
+                    next_texts = pool.submit(build_texts, chunks[batch_number])
+
+                embeddings = model.encode(
+                    texts,
+                    batch_size=self._encode_batch_size,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False,
+                ).tolist()
+                updates = [
+                    {"company_id": node_data["company_id"], "embedding": embedding}
+                    for node_data, embedding in zip(chunk, embeddings)
+                ]
+
+                if pending_write is not None:
+                    pending_write.result()
+                pending_write = pool.submit(write, batch_number, updates)
+            pending_write.result()
 
     def run_knn_projection(self, projection_name: str = "graph_projection", k: int = 10):
         """
-        Project the graph using K-NN similarity on the `_embedding` property.
+        Project the graph using K-NN similarity on the `vector` property.
         """
         from app.db.neo4j_client import get_gds_session
 
@@ -158,7 +231,7 @@ class GraphService:
         node_query = """
         MATCH (n)
         WHERE n:Company OR n:Fund
-        RETURN id(n) AS id, labels(n) AS labels, n._embedding AS _embedding
+        RETURN id(n) AS id, labels(n) AS labels, n.vector AS _embedding
         """
 
         relationship_query = """
@@ -198,7 +271,7 @@ class GraphService:
         node_query = """
         MATCH (n)
         WHERE n:Company OR n:Fund
-        RETURN id(n) AS id, labels(n) AS labels, n._embedding AS _embedding
+        RETURN id(n) AS id, labels(n) AS labels, n.vector AS _embedding
         """
 
         relationship_query = """
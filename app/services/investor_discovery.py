@@ -50,12 +50,7 @@ except ImportError:
     gemini_model = None
 
 from app.db.queries import company_queries, relationship_queries, investor_queries
-
-
-def is_valid_org_number(org_id: str) -> bool:
-    """Validate Swedish organization number format (10 digits)."""
-    cleaned = re.sub(r'[-\s]', '', str(org_id))
-    return len(cleaned) == 10 and cleaned.isdigit()
+from app.utils.validators import is_valid_org_number
 
 
 def extract_org_number_from_text(text: str) -> Optional[str]:
@@ -6,18 +6,25 @@ Recursively processes portfolio companies and creates OWNS relationships.
 import sys
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Set, Optional
 
 # Add hack_net.py to path
 HACK_NET_PATH = Path(__file__).parent.parent.parent / "data_pipeline" / "illegal"
 
+from app.db.neo4j_client import release_thread_session
 from app.db.queries import company_queries, relationship_queries, investor_queries
 from app.models import EntityRef
-from app.services.company_data_extraction import extract_company_fields
+from app.services.company_data_extraction import extract_company_fields, extract_many
+from app.utils.validators import is_valid_org_number
 
 logger = logging.getLogger(__name__)
 
+# Shared pool for running ingestion off the event loop; reused across requests instead
+# of spinning up a fresh pool per call
+INGEST_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ingest")
+
 # Try to import investor discovery (may fail if dependencies missing)
 try:
     from app.services.investor_discovery import discover_and_link_investors
@@ -62,19 +69,6 @@ except ImportError:
     gemini_model = None
 
 
-def is_valid_org_number(org_id: str) -> bool:
-    """
-    Check if string is a valid Swedish organization number format.
-    Format: 10 digits, optionally with dash (e.g., "556043-4200" or "5560434200")
-    """
-    import re
-
-    # Remove dashes and spaces
-    cleaned = re.sub(r"[-\s]", "", org_id)
-    # Check if it's exactly 10 digits
-    return len(cleaned) == 10 and cleaned.isdigit()
-
-
 def extract_portfolio_from_fi(organization_id: str) -> tuple[List[Dict[str, Any]], Optional[str]]:
     """
     Call hack_net.py to extract portfolio companies from FI documents.
@@ -395,6 +389,9 @@ def process_portfolio_companies(
     visited.add(source_org_id)
 
     entity_refs = []
+    # Resolved portfolio companies waiting for field extraction:
+    # (company_name, target_org_id, ownership_pct, portfolio_data_recursive, report_text_recursive)
+    pending = []
 
     for item in portfolio_data:
         company_name = item.get("company_name", "").strip()
@@ -429,10 +426,15 @@ def process_portfolio_companies(
 
         # Try to get report text for this portfolio company
         portfolio_data_recursive, report_text_recursive = extract_portfolio_from_fi(target_org_id)
+        pending.append((company_name, target_org_id, ownership_pct, portfolio_data_recursive, report_text_recursive))
 
-        # Extract fields from both report and web search
-        extracted_fields = extract_company_fields(company_name, target_org_id, report_text_recursive)
+    # Extract fields from both report and web search for all portfolio companies at once;
+    # each extraction is dominated by Gemini/Tavily latency, so they run concurrently
+    all_extracted = extract_many([(name, org_id, report) for name, org_id, _, _, report in pending])
 
+    for (company_name, target_org_id, ownership_pct, portfolio_data_recursive, _), extracted_fields in zip(
+        pending, all_extracted
+    ):
         # Update the company node with extracted fields
         if extracted_fields:
             target_company = company_queries.get_company(target_org_id) or {}
@@ -460,7 +462,7 @@ def process_portfolio_companies(
             # Use portfolio_data_recursive check, not recursive_entities, because
             # recursive_entities might be empty if all items were already visited
             logger.info(f"Company {target_org_id} has portfolio - converting to Fund")
-            company_queries.convert_company_to_fund(target_org_id)
+            investor_queries.convert_company_to_fund(target_org_id)
             # Update as Fund with portfolio data and extracted fields, preserving all existing fields
             portfolio_data_for_storage = [
                 {
@@ -491,6 +493,14 @@ def ingest_company_with_portfolio(organization_id: str, name: str) -> Dict[str,
     Returns:
         Dict with portfolio EntityRefs and processing stats
     """
+    try:
+        return _ingest_company_with_portfolio(organization_id, name)
+    finally:
+        # Ingestion runs on a worker thread; close the read session bound to it
+        release_thread_session()
+
+
+def _ingest_company_with_portfolio(organization_id: str, name: str) -> Dict[str, Any]:
     # Ensure source company exists
     existing = company_queries.get_company(organization_id)
     if not existing:
@@ -537,7 +547,7 @@ def ingest_company_with_portfolio(organization_id: str, name: str) -> Dict[str,
                 # Convert to Fund if not already, and upsert as Fund
                 if "Fund" not in labels:
                     logger.info(f"Converting {organization_id} to Fund (has portfolio or is being ingested as fund)")
-                    company_queries.convert_company_to_fund(organization_id)
+                    investor_queries.convert_company_to_fund(organization_id)
                 logger.info(f"Upserting Fund {organization_id} with data: {list(existing.keys())}")
                 investor_queries.upsert_investor(existing)
                 logger.info(
@@ -616,7 +626,7 @@ def ingest_company_with_portfolio(organization_id: str, name: str) -> Dict[str,
     # If portfolio was found, convert Company to Fund (add Fund label)
     if portfolio_entities:
         logger.info(f"Company {organization_id} has portfolio - converting to Fund")
-        company_queries.convert_company_to_fund(organization_id)
+        investor_queries.convert_company_to_fund(organization_id)
         # Get existing company data to preserve all fields
         existing_company = company_queries.get_company(organization_id) or {}
         # Update as Fund, preserving all existing fields
@@ -0,0 +1,27 @@
+import re
+
+# Separators allowed in organization numbers (e.g. "556043-4200")
+_ORGNR_STRIP = re.compile(r"[-\s]")
+# Same separator set as a bytes delete table, for the ASCII fast path
+_ORGNR_DELETE = b"- \t\n\r\f\v"
+
+
+def normalize_org_number(org_id) -> str:
+    """
+    Strip dashes and whitespace from a Swedish organization number.
+    """
+    return _ORGNR_STRIP.sub("", str(org_id))
+
+
+def is_valid_org_number(org_id) -> bool:
+    """
+    Check if string is a valid Swedish organization number format.
+    Format: 10 digits, optionally with dash (e.g., "556043-4200" or "5560434200")
+    """
+    org_id = str(org_id)
+    if org_id.isascii():
+        # bytes.translate + bytes.isdigit are C-level, no regex dispatch
+        cleaned = org_id.encode("ascii").translate(None, _ORGNR_DELETE)
+    else:
+        cleaned = normalize_org_number(org_id)
+    return len(cleaned) == 10 and cleaned.isdigit()
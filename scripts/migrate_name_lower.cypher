@@ -0,0 +1,9 @@
+// Backfill name_lower on existing Company and Fund nodes and index it.
+// Safe to re-run. Used by the chat agent's exact company name lookup.
+CREATE INDEX company_name_lower IF NOT EXISTS FOR (c:Company) ON (c.name_lower);
+CREATE INDEX fund_name_lower IF NOT EXISTS FOR (f:Fund) ON (f.name_lower);
+
+MATCH (n)
+WHERE (n:Company OR n:Fund) AND n.name IS NOT NULL
+SET n.name_lower = toLower(n.name)
+RETURN count(*) AS updated;
@@ -0,0 +1,12 @@
+// Build (:Fund)-[:INVESTS_IN]->(:Sector) edges from the existing f.sectors lists.
+// Safe to re-run: everything is MERGEd. Used by find_investors_by_sector.
+CREATE INDEX sector_name IF NOT EXISTS FOR (s:Sector) ON (s.name);
+
+MATCH (f:Fund)
+WHERE f.sectors IS NOT NULL
+UNWIND f.sectors AS name
+WITH f, name
+WHERE name IS NOT NULL
+MERGE (s:Sector {name: name})
+MERGE (f)-[:INVESTS_IN]->(s)
+RETURN count(*) AS links;
@@ -0,0 +1,256 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.services import agent_service
+from app.services.agent_service import CompanyAgentTools, InputValidator
+
+
+@pytest.fixture
+def aura_api():
+    """Route the shared HTTP client to a fake Aura token endpoint and agent."""
+    calls = {"token": 0, "agent": 0}
+    agent_statuses = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/oauth/token":
+            calls["token"] += 1
+            return httpx.Response(200, json={"access_token": f"tok{calls['token']}", "expires_in": 3600})
+        calls["agent"] += 1
+        status = agent_statuses.pop(0) if agent_statuses else 200
+        return httpx.Response(status, json={"text": request.headers["Authorization"]})
+
+    agent_service._token_cache.update(token=None, expires_at=0.0)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with (
+        patch.object(agent_service, "_http_client", client),
+        patch.object(agent_service, "AURA_CLIENT_ID", "id"),
+        patch.object(agent_service, "AURA_CLIENT_SECRET", "secret"),
+        patch.object(agent_service, "NEO_AGENT_URL", "https://agent.test/invoke"),
+    ):
+        yield calls, agent_statuses
+    agent_service._token_cache.update(token=None, expires_at=0.0)
+
+
+def test_token_is_fetched_once_and_reused(aura_api):
+    calls, _ = aura_api
+    tools = CompanyAgentTools()
+
+    async def run():
+        return await asyncio.gather(*(tools._get_neo4j_token() for _ in range(5)))
+
+    assert asyncio.run(run()) == ["tok1"] * 5
+    assert calls["token"] == 1
+
+
+def test_agent_401_refreshes_token_and_retries_once(aura_api):
+    calls, agent_statuses = aura_api
+    agent_statuses.append(401)
+    tools = CompanyAgentTools()
+
+    async def run():
+        token = await tools._get_neo4j_token()
+        return await tools._post_agent({"input": "q"}, token, timeout=5.0)
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert response.json() == {"text": "Bearer tok2"}
+    assert calls == {"token": 2, "agent": 2}
+
+
+def test_agent_response_is_cached_per_company(aura_api):
+    calls, _ = aura_api
+    tools = CompanyAgentTools()
+    agent_service.agent_response_cache.clear()
+
+    async def run():
+        return [await tools.query_neo4j_agent({"company_id": "5560434200"}) for _ in range(3)]
+
+    assert asyncio.run(run()) == [{"text": "Bearer tok1"}] * 3
+    assert calls["agent"] == 1
+    agent_service.agent_response_cache.clear()
+
+
+def test_agent_errors_are_cached_briefly(aura_api):
+    calls, agent_statuses = aura_api
+    agent_statuses.append(500)
+    tools = CompanyAgentTools()
+    agent_service.agent_error_cache.clear()
+
+    async def run():
+        return [await tools.query_neo4j_agent({"company_id": "5560434200"}) for _ in range(2)]
+
+    first, second = asyncio.run(run())
+    assert first == second == {"error": "Neo4j agent authentication failed: 500"}
+    assert calls["agent"] == 1
+    agent_service.agent_error_cache.clear()
+
+
+def test_classification_is_cached_per_normalized_query():
+    model = MagicMock()
+    model.generate_content_async = AsyncMock(
+        return_value=MagicMock(text='{"type": "company_name", "confidence": 0.9, "reasoning": "name"}')
+    )
+    agent_service._classifier_cache.clear()
+
+    with patch.object(agent_service, "gemini_model", model):
+        first = asyncio.run(InputValidator._classify_query_agentic("Ericsson"))
+        second = asyncio.run(InputValidator._classify_query_agentic("  ericsson "))
+
+    assert first == second == {"type": "company_name", "confidence": 0.9, "reasoning": "name"}
+    assert model.generate_content_async.await_count == 1
+    agent_service._classifier_cache.clear()
+
+
+def test_org_numbers_and_long_questions_skip_gemini():
+    model = MagicMock()
+
+    with patch.object(agent_service, "gemini_model", model):
+        assert asyncio.run(InputValidator._classify_query_agentic("556043-4200"))["type"] == "org_id"
+        question = "Who owns Ericsson and what else do they also own?"
+        assert asyncio.run(InputValidator._classify_query_agentic(question))["type"] == "general_query"
+
+    model.generate_content_async.assert_not_called()
+
+
+def test_concurrent_classifications_share_one_gemini_call():
+    async def generate(prompt):
+        await asyncio.sleep(0.05)
+        return MagicMock(text='{"type": "company_name", "confidence": 0.8, "reasoning": ""}')
+
+    model = MagicMock()
+    model.generate_content_async = AsyncMock(side_effect=generate)
+    agent_service._classifier_cache.clear()
+
+    async def run():
+        return await asyncio.gather(*(InputValidator.classify_query("Volvo") for _ in range(4)))
+
+    with patch.object(agent_service, "gemini_model", model):
+        results = asyncio.run(run())
+
+    assert [r["type"] for r in results] == ["company_name"] * 4
+    assert model.generate_content_async.await_count == 1
+    agent_service._classifier_cache.clear()
+
+
+def test_process_query_passes_agent_dict_through():
+    question = "Who owns Ericsson and what else do they also own?"
+    with (
+        patch.object(agent_service, "gemini_model", None),
+        patch.object(CompanyAgentTools, "query_neo4j_agent_general", return_value={"text": "Investor AB"}) as agent,
+    ):
+        response = asyncio.run(agent_service.process_query(question))
+
+    agent.assert_awaited_once_with(question)
+    assert response.message == "Investor AB"
+    assert response.error is None
+
+
+def test_convert_neo4j_to_json_keeps_scalars_and_formats_temporals():
+    from neo4j.time import DateTime
+
+    node = {"name": "Spotify AB", "num_employees": 9000, "sectors": ["Music"], "updated_at": DateTime(2024, 1, 15)}
+
+    converted = CompanyAgentTools()._convert_neo4j_to_json(node)
+
+    assert converted["name"] == "Spotify AB"
+    assert converted["num_employees"] == 9000
+    assert converted["sectors"] == ["Music"]
+    assert converted["updated_at"].startswith("2024-01-15T00:00:00")
+
+
+def test_extract_final_text_prefers_latest_untyped_or_text_entry():
+    log = [
+        {"type": "text", "text": "draft"},
+        {"message": " final answer "},
+        {"type": "tool_result", "output": {"text": "tool noise"}},
+        "not an entry",
+    ]
+    assert agent_service.extract_final_text(log) == "final answer"
+    assert agent_service.extract_final_text([{"output": {"text": "from output"}}, {"type": "text", "text": ""}]) == (
+        "from output"
+    )
+    assert agent_service.extract_final_text([{"type": "tool_call"}]) is None
+
+
+def test_process_query_validates_once():
+    validation = {"valid": True, "type": "company_name", "cleaned": "Nowhere AB", "error": None}
+    not_found = {"found": False, "query": "Nowhere AB", "query_type": "company_name"}
+    with (
+        patch.object(InputValidator, "validate_input", AsyncMock(return_value=validation)) as validate,
+        patch.object(CompanyAgentTools, "_search_database_uncached", AsyncMock(return_value=not_found)),
+        patch.object(agent_service, "tavily_client", None),
+    ):
+        response = asyncio.run(agent_service.process_query("Nowhere AB"))
+
+    assert validate.await_count == 1
+    assert response.company_found is False
+    agent_service.lookup_miss_cache.clear()
+
+
+def test_concurrent_lookups_share_one_query():
+    session = MagicMock()
+    session.execute_read = AsyncMock(return_value=[("Volvo", {"name": "Volvo", "company_id": "5560125790"}, "Company")])
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=False)
+    driver = MagicMock()
+    driver.session.return_value = session
+
+    async def run():
+        return await asyncio.gather(*(agent_service._lookup_entity(q) for q in ("Volvo", "Volvo", "Saab")))
+
+    with patch.object(agent_service, "get_async_driver", return_value=driver):
+        volvo, volvo_again, saab = asyncio.run(run())
+
+    assert volvo == volvo_again == ({"name": "Volvo", "company_id": "5560125790"}, "Company")
+    assert saab is None
+    session.execute_read.assert_awaited_once()
+    lookups = session.execute_read.await_args.kwargs["lookups"]
+    assert lookups == [{"query": "Volvo", "name_lower": "volvo"}, {"query": "Saab", "name_lower": "saab"}]
+
+
+def test_concurrent_identical_queries_share_one_run():
+    question = "Who owns Ericsson and what else do they also own?"
+
+    async def answer(query):
+        await asyncio.sleep(0.05)
+        return {"text": "Investor AB"}
+
+    async def run():
+        return await asyncio.gather(*(agent_service.process_query(question) for _ in range(3)))
+
+    with (
+        patch.object(agent_service, "gemini_model", None),
+        patch.object(CompanyAgentTools, "query_neo4j_agent_general", side_effect=answer) as agent,
+    ):
+        responses = asyncio.run(run())
+
+    assert [r.message for r in responses] == ["Investor AB"] * 3
+    assert agent.await_count == 1
+
+
+def test_waiters_take_over_when_the_owning_query_is_cancelled():
+    validation = {"valid": True, "type": "general_query", "cleaned": "x", "error": None}
+
+    async def answer(validation):
+        await asyncio.sleep(0.05)
+        return agent_service.AgentResponse(message="ok", company_found=False)
+
+    async def run():
+        owner = asyncio.create_task(agent_service.process_query("x"))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(agent_service.process_query("x")) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        return await asyncio.gather(*waiters)
+
+    with (
+        patch.object(InputValidator, "validate_input", AsyncMock(return_value=validation)),
+        patch.object(agent_service, "_answer_query", side_effect=answer),
+    ):
+        responses = asyncio.run(run())
+
+    assert [r.message for r in responses] == ["ok", "ok"]
+    assert agent_service._process_inflight == {}
@@ -0,0 +1,29 @@
+from unittest.mock import patch
+from app.utils.cache import TTLCache
+
+
+def test_get_set_and_pop():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.pop("a") == 1
+    assert cache.get("a") is None
+
+
+def test_entries_expire():
+    cache = TTLCache(maxsize=10, ttl=5)
+    with patch("app.utils.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+    with patch("app.utils.cache.time.monotonic", return_value=106.0):
+        assert cache.get("a", "missing") == "missing"
+
+
+def test_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
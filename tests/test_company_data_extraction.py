@@ -0,0 +1,63 @@
+from unittest.mock import MagicMock, patch
+
+from app.services import company_data_extraction
+from app.utils.cache import TTLCache
+
+
+def test_extraction_results_are_cached_but_failures_are_not():
+    model = MagicMock()
+    # Streamed in chunks, as generate_content(stream=True) returns it
+    model.generate_content.return_value = [
+        MagicMock(text='{"description": "Batteries", '),
+        MagicMock(text='"sectors": ["Energy"]}'),
+    ]
+
+    with (
+        patch.object(company_data_extraction, "report_model", model),
+        patch.object(company_data_extraction, "_extract_cache", TTLCache()),
+    ):
+        first = company_data_extraction.extract_company_data_from_report("report text", "Northvolt AB", "5592248790")
+        second = company_data_extraction.extract_company_data_from_report("report text", "Northvolt AB", "5592248790")
+        assert first == second == {"description": "Batteries", "sectors": ["Energy"]}
+        assert model.generate_content.call_count == 1
+
+        model.generate_content.side_effect = RuntimeError("quota")
+        for _ in range(2):
+            # Failures come back empty and aren't cached, so both calls reach the model
+            assert (
+                company_data_extraction.extract_company_data_from_report("other report", "Northvolt AB", "5592248790")
+                == {}
+            )
+        assert model.generate_content.call_count == 3
+
+
+def test_merge_prefers_report_and_unions_lists():
+    report = {"description": "From report", "website": "", "num_employees": 0, "sectors": ["Energy", "Batteries"]}
+    web = {
+        "description": "From web",
+        "website": "northvolt.com",
+        "sectors": ["Batteries", "Manufacturing"],
+        "key_people": ["Peter Carlsson"],
+        "mission": "  ",
+    }
+
+    merged = company_data_extraction.merge_company_data(report, web)
+
+    assert merged == {
+        "description": "From report",
+        "website": "https://www.northvolt.com",
+        "num_employees": 0,
+        "sectors": ["Energy", "Batteries", "Manufacturing"],
+        "key_people": ["Peter Carlsson"],
+    }
+
+
+def test_generate_json_text_stops_once_the_object_closes():
+    chunks = [MagicMock(text='```json\n{"name": "A {b}", '), MagicMock(text='"q": "\\"}"}\n'), MagicMock(text="```")]
+    model = MagicMock()
+    model.generate_content.return_value = iter(chunks)
+
+    text = company_data_extraction._generate_json_text(model, "prompt")
+
+    assert text == '```json\n{"name": "A {b}", "q": "\\"}"}'
+    assert next(model.generate_content.return_value).text == "```"
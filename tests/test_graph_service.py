@@ -65,19 +65,23 @@ def test_generate_and_store_embeddings(mock_driver, mock_sentence_transformer):
     # We need to simulate the dict structure returned by Neo4j driver, including 'labels'
     company_dict = mock_company.model_dump()
     company_dict["labels"] = ["Company"]
+    company_dict["company_id"] = "1"
 
     investor_dict = mock_investor.model_dump()
     investor_dict["labels"] = ["Fund"]
     # Service expects 'company_id' in the dict to map it to 'investor_id'
     investor_dict["company_id"] = mock_investor.investor_id
 
-    mock_result = [company_dict, investor_dict]
+    # Nodes without a company_id can't be written back and are skipped before encoding
+    orphan_dict = {"labels": ["Company"], "company_id": None, "name": "Orphan"}
+
+    mock_result = [company_dict, orphan_dict, investor_dict]
     # session.run returns an iterable of records (which behave like dicts)
     mock_session.run.return_value = mock_result
 
     # Mock encoding
     mock_model = mock_sentence_transformer.return_value
-    mock_model.encode.return_value = [np.array([0.1, 0.2]), np.array([0.3, 0.4])]
+    mock_model.encode.return_value = np.array([[0.1, 0.2], [0.3, 0.4]])
 
     # Init service
     service = GraphService()
@@ -87,12 +91,38 @@ def test_generate_and_store_embeddings(mock_driver, mock_sentence_transformer):
     args, _ = mock_session.run.call_args_list[0]
     assert "MATCH (n)" in args[0]
 
-    # Verify update called
-    args, kwargs = mock_session.run.call_args_list[1]
-    assert "SET n._embedding" in args[0]
-    assert len(kwargs["updates"]) == 2
-    assert kwargs["updates"][0]["company_id"] == "1"
-    assert kwargs["updates"][1]["company_id"] == "2"
+    # Verify update written in one managed transaction
+    mock_session.execute_write.assert_called_once()
+    write_fn, updates = mock_session.execute_write.call_args.args
+    assert len(updates) == 2
+    assert updates[0]["company_id"] == "1"
+    assert updates[1]["company_id"] == "2"
+    assert updates[1]["embedding"] == [0.3, 0.4]
+
+    tx = MagicMock()
+    write_fn(tx, updates)
+    assert "SET n.vector" in tx.run.call_args.args[0]
+
+    # All texts go through a single encode call
+    mock_model.encode.assert_called_once()
+    assert len(mock_model.encode.call_args.args[0]) == 2
+
+
+def test_generate_embedding_text_skips_empty_fields(mock_sentence_transformer):
+    node = {
+        "name": "Company A",
+        "company_id": "1",
+        "aliases": [],
+        "sectors": ["Tech", "Music"],
+        "year_founded": None,
+        "num_employees": 0,
+        "key_people": [{"name": "Ada"}, {"name": "Bo"}],
+        "website": None,
+    }
+
+    text = GraphService()._generate_embedding_text(node)
+
+    assert text == "Name: Company A. ID: 1. Sectors: Tech, Music. Employees: 0. Key People: Ada, Bo"
 
 
 def test_run_leiden_clustering(mock_driver, mock_sentence_transformer):
@@ -0,0 +1,16 @@
+import pytest
+from app.utils.validators import is_valid_org_number, normalize_org_number
+
+
+@pytest.mark.parametrize("org_id", ["556043-4200", "5560434200", " 556043 4200 "])
+def test_valid_org_numbers(org_id):
+    assert is_valid_org_number(org_id)
+
+
+@pytest.mark.parametrize("org_id", ["", "556043-420", "55604342001", "55604A4200", None])
+def test_invalid_org_numbers(org_id):
+    assert not is_valid_org_number(org_id)
+
+
+def test_normalize_org_number():
+    assert normalize_org_number("556043-4200") == "5560434200"